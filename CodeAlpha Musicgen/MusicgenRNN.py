@@ -1,5 +1,9 @@
 
+import argparse
+import collections
+import itertools
 import random
+import sys
 import time
 import platform
 
@@ -8,11 +12,11 @@ if platform.system() == "Windows":
     try:
         import winsound
         _WINSOUND_AVAILABLE = True
-        print("Windows OS: `winsound` available for beeps.")
+        print("Windows OS: `winsound` available for beeps.", file=sys.stderr)
     except ImportError:
-        print("Windows OS: `winsound` module not found. Will only print notes.")
-else:
-    print(f"{platform.system()} OS: `winsound` not available. Will only print notes.")
+        print("Windows OS: `winsound` module not found. Will only print notes.", file=sys.stderr)
+else: # stderr, so tools importing this module can stream audio on stdout
+    print(f"{platform.system()} OS: `winsound` not available. Will only print notes.", file=sys.stderr)
 
 # --- Musical Elements ---
 SCALE_NOTES = ['C', 'D', 'E', 'F', 'G', 'A', 'B']
@@ -52,43 +56,79 @@ for i in range(num_scale_notes):
         transitions.append(((i - 3 + num_scale_notes) % num_scale_notes, 0.5))
     transition_matrix[i] = transitions
 
+# Unzipped once up front so sampling a note doesn't rebuild the option lists every call
+_transition_choices = {}
+for i, options in transition_matrix.items():
+    next_indices, weights = zip(*options)
+    _transition_choices[i] = (next_indices, list(itertools.accumulate(weights)))
+
 
 def get_next_note_markov(current_note_idx):
     """Selects the next note based on the Markov transition matrix."""
-    if current_note_idx not in transition_matrix: # Should not happen if matrix is complete
+    if current_note_idx not in _transition_choices: # Should not happen if matrix is complete
         return random.randint(0, num_scale_notes - 1) 
 
-    options = transition_matrix[current_note_idx]
-    next_note_indices, weights = zip(*options)
-    chosen_next_note_idx = random.choices(next_note_indices, weights=weights, k=1)[0]
+    next_note_indices, cum_weights = _transition_choices[current_note_idx]
+    chosen_next_note_idx = random.choices(next_note_indices, cum_weights=cum_weights, k=1)[0]
     return chosen_next_note_idx
 
-def generate_music_phrase_markov(num_notes=8, start_note_idx=None):
-    """Generates a phrase of music using the Markov chain."""
-    phrase = []
+def note_id_for(note_idx, octave):
+    """'C4'-style id for a scale index, or 'Rest' for None."""
+    return "Rest" if note_idx is None else f"{SCALE_NOTES[note_idx % num_scale_notes]}{octave}"
+
+def iter_note_events(start_note_idx=None, model=None):
+    """Endless melody as (note_idx, duration_ms) pairs; note_idx is None for a rest.
+
+    The only state carried from note to note is the current scale index (or, with a learned
+    model, its last few tokens), so memory stays constant however long a consumer pulls.
+    """
     if start_note_idx is None:
         current_note_idx = random.randint(0, num_scale_notes - 1)
     else:
         current_note_idx = start_note_idx
-    
-    octave_val = random.choice(OCTAVES) # Octave can be fixed or varied per phrase/note
 
-    for _ in range(num_notes):
-        note_name = SCALE_NOTES[current_note_idx]
-        full_note_id = f"{note_name}{octave_val}" # e.g., C4
-        
+    if model is not None:
+        history = collections.deque(maxlen=max(1, model.order))
+        token = model.next_token([], pitch_idx=current_note_idx)
+        while True:
+            history.append(token)
+            yield model.vocab.decode(token)
+            token = model.next_token(list(history))
+
+    durations = list(DURATIONS_MS.values())
+    while True:
         # Simple rhythm: random duration, occasional rests
         if random.random() < 0.15: # 15% chance of a rest
-            note_to_play = "Rest"
-            duration_ms = random.choice(list(DURATIONS_MS.values())) // 2 # Shorter rests
+            yield None, random.choice(durations) // 2 # Shorter rests
         else:
-            note_to_play = full_note_id
-            duration_ms = random.choice(list(DURATIONS_MS.values()))
+            note_idx = current_note_idx
+            duration_ms = random.choice(durations)
             current_note_idx = get_next_note_markov(current_note_idx) # Get next note for melody
-            
-        phrase.append((note_to_play, duration_ms))
-        
-    return phrase
+            yield note_idx, duration_ms
+
+def generate_music_phrase_markov(num_notes=8, start_note_idx=None, model=None):
+    """Generates a phrase of music using the Markov chain.
+
+    If a learned model (markov_training.NgramMarkovModel) is given, notes, rests and
+    durations all come from it instead of the hand-written transition_matrix.
+    """
+    if start_note_idx is None:
+        current_note_idx = random.randint(0, num_scale_notes - 1)
+    else:
+        current_note_idx = start_note_idx
+    
+    octave_val = random.choice(OCTAVES) # Octave can be fixed or varied per phrase/note
+
+    notes = itertools.islice(iter_note_events(current_note_idx, model), num_notes)
+    return [(note_id_for(note_idx, octave_val), duration_ms) for note_idx, duration_ms in notes]
+
+def iter_phrases(notes_per_phrase, start_note_idx=None, model=None):
+    """Endless phrases; each one continues the melody exactly where the previous one stopped."""
+    note_events = iter_note_events(start_note_idx, model)
+    while True:
+        octave_val = random.choice(OCTAVES)
+        yield [(note_id_for(note_idx, octave_val), duration_ms)
+               for note_idx, duration_ms in itertools.islice(note_events, notes_per_phrase)]
 
 def play_phrase_with_sound(phrase):
     """Plays the generated phrase with beeps (Windows) or prints (others)."""
@@ -110,13 +150,32 @@ def play_phrase_with_sound(phrase):
     print("-" * 20)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Markov chain music note sequence generator.")
+    parser.add_argument("model", nargs="?", default=None, help="Optional model saved by markov_training.py.")
+    parser.add_argument("--phrases", type=int, default=None, help="Number of phrases (prompted for if omitted on a terminal).")
+    parser.add_argument("--notes", type=int, default=None, help="Notes per phrase (prompted for if omitted on a terminal).")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible output.")
+    parser.add_argument("--no-play", action="store_true", help="Only print the phrases, don't beep or wait.")
+    args = parser.parse_args()
+
     print("=== RNNS/GANNs Music Note Sequence Generator (with Basic Sound on Windows) ===")
     print("This script uses a simple RNNs base Markovchain to generate note sequences.")
     print("It's a conceptual step towards RNNs/GANs.\n")
 
+    random.seed(args.seed)
+    learned_model = None
+    if args.model:
+        from markov_training import NgramMarkovModel
+        learned_model = NgramMarkovModel.load(args.model)
+        print(f"Using learned order-{learned_model.order} model from {args.model}.\n")
+
+    num_phrases, notes_per_phrase = args.phrases, args.notes
+    interactive = sys.stdin.isatty() and (num_phrases is None or notes_per_phrase is None)
     try:
-        num_phrases = int(input("Enter number of musical phrases to generate (e.g., 2-4): ") or "2")
-        notes_per_phrase = int(input(f"Enter notes per phrase (e.g., 4-8, default: {BEATS_PER_MEASURE*2}): ") or str(BEATS_PER_MEASURE * 2))
+        if num_phrases is None:
+            num_phrases = int((input("Enter number of musical phrases to generate (e.g., 2-4): ") if interactive else "") or "2")
+        if notes_per_phrase is None:
+            notes_per_phrase = int((input(f"Enter notes per phrase (e.g., 4-8, default: {BEATS_PER_MEASURE*2}): ") if interactive else "") or str(BEATS_PER_MEASURE * 2))
         if num_phrases <= 0: num_phrases = 2
         if notes_per_phrase <= 0: notes_per_phrase = BEATS_PER_MEASURE * 2
     except ValueError:
@@ -124,21 +183,17 @@ if __name__ == "__main__":
         num_phrases = 2
         notes_per_phrase = BEATS_PER_MEASURE * 2
 
-    current_phrase_start_note_idx = random.randint(0, num_scale_notes - 1)
-    for i in range(num_phrases):
+    # Phrases come from one continuous note stream, so each picks up where the last one ended
+    phrases = iter_phrases(notes_per_phrase, model=learned_model)
+    for i, music_phrase in enumerate(itertools.islice(phrases, num_phrases)):
         print(f"\n--- Generating Phrase {i+1} ---")
-        music_phrase = generate_music_phrase_markov(num_notes=notes_per_phrase, start_note_idx=current_phrase_start_note_idx)
-        play_phrase_with_sound(music_phrase)
-        
-        # For next phrase, start near where the last one ended (simple continuity)
-        if music_phrase:
-            last_note_played_id = music_phrase[-1][0]
-            if last_note_played_id != "Rest":
-                last_note_name = last_note_played_id[:-1] # Remove octave
-                if last_note_name in SCALE_NOTES:
-                    current_phrase_start_note_idx = SCALE_NOTES.index(last_note_name)
-
+        if args.no_play:
+            for j, (note_id, duration_ms) in enumerate(music_phrase):
+                print(f"  {j+1}. Note: {note_id:<4} Duration: {duration_ms}ms")
+        else:
+            play_phrase_with_sound(music_phrase)
 
-    if not _WINSOUND_AVAILABLE:
+    if not _WINSOUND_AVAILABLE and not args.no_play:
         print("\nNote: Audible beeps via 'winsound' are only available on Windows.")
-        print("On other systems, note durations were simulated by pausing.")
\ No newline at end of file
+        print("On other systems, note durations were simulated by pausing.")
+        print("For endless or faster-than-real-time output, see music_stream.py.")
@@ -0,0 +1,201 @@
+# audio_render.py
+# Renders generated phrases straight to 16-bit PCM / WAV, much faster than real time.
+import argparse
+import collections
+import random
+import sys
+import time
+import wave
+
+import numpy as np
+
+import MusicgenRNN as music
+
+DEFAULT_SAMPLE_RATE = 22050
+DEFAULT_BLOCK_SAMPLES = 1 << 15 # Scratch buffers are this long; rendering never allocates per note
+ATTACK_MS = 5 # Short ramps at each note edge so the waveform never jumps (clicks)
+RELEASE_MS = 20
+WAVEFORMS = ("sine", "triangle", "square")
+
+
+class PhraseRenderer:
+    """Vectorized oscillator bank: every sample of a block is computed in one pass, whatever note it belongs to."""
+
+    def __init__(self, sample_rate=DEFAULT_SAMPLE_RATE, amplitude=0.3, waveform="sine", block_samples=DEFAULT_BLOCK_SAMPLES):
+        if waveform not in WAVEFORMS:
+            raise ValueError(f"Unknown waveform '{waveform}', expected one of {WAVEFORMS}")
+        self.sample_rate = sample_rate
+        self.amplitude = amplitude
+        self.waveform = waveform
+        self.block_samples = block_samples
+        self._positions = np.arange(block_samples, dtype=np.int64)
+        self._scratch = np.empty(block_samples, dtype=np.float64)
+        self._envelope = np.empty(block_samples, dtype=np.float64)
+        self._block = np.empty(block_samples, dtype=np.int16)
+
+    def note_table(self, phrase):
+        """(frequencies_hz, start_samples, length_samples) for a [(note_id, duration_ms), ...] phrase."""
+        freqs = np.array([music.NOTE_FREQUENCIES.get(note_id, 0) for note_id, _ in phrase], dtype=np.float64)
+        lengths = np.array([duration_ms for _, duration_ms in phrase], dtype=np.int64) * self.sample_rate // 1000
+        starts = np.cumsum(lengths) - lengths
+        return freqs, starts, lengths
+
+    def _render_into(self, out, first_sample, freqs, starts, lengths):
+        """Fills out (int16) with samples first_sample .. first_sample + len(out) of the note table."""
+        n = len(out)
+        positions = self._positions[:n] + first_sample
+        note = np.searchsorted(starts, positions, side="right") - 1
+        since_start = positions - starts[note] # Phase restarts at every note, envelope hides the seam
+        note_len = lengths[note]
+
+        scratch, envelope = self._scratch[:n], self._envelope[:n]
+        np.multiply(freqs[note] / self.sample_rate, since_start, out=scratch)
+        if self.waveform == "sine":
+            np.sin(2 * np.pi * scratch, out=scratch)
+        else:
+            np.mod(scratch, 1.0, out=scratch)
+            if self.waveform == "square":
+                np.subtract(0.5, scratch, out=scratch)
+                np.sign(scratch, out=scratch)
+            else: # triangle
+                np.subtract(scratch, 0.5, out=scratch)
+                np.abs(scratch, out=scratch)
+                np.multiply(scratch, 4.0, out=scratch)
+                np.subtract(scratch, 1.0, out=scratch)
+
+        attack = max(1, ATTACK_MS * self.sample_rate // 1000)
+        release = max(1, RELEASE_MS * self.sample_rate // 1000)
+        np.divide(since_start, attack, out=envelope)
+        np.minimum(envelope, (note_len - since_start) / release, out=envelope)
+        np.clip(envelope, 0.0, 1.0, out=envelope)
+
+        np.multiply(scratch, envelope, out=scratch)
+        np.multiply(scratch, self.amplitude * 32767, out=scratch)
+        out[:] = scratch # Rests have frequency 0, so they come out as silence
+
+    def render(self, phrase, out=None):
+        """Renders a whole phrase to int16 PCM. Pass out to reuse a buffer of at least the phrase length."""
+        freqs, starts, lengths = self.note_table(phrase)
+        total = int(lengths.sum())
+        if out is None:
+            out = np.empty(total, dtype=np.int16)
+        elif len(out) < total:
+            raise ValueError(f"Output buffer holds {len(out)} samples, phrase needs {total}")
+        for offset in range(0, total, self.block_samples):
+            self._render_into(out[offset:offset + self.block_samples], offset, freqs, starts, lengths)
+        return out[:total]
+
+    def iter_blocks(self, phrase):
+        """Yields the phrase as int16 blocks of block_samples (last one shorter).
+
+        The same buffer is reused for every block: consume or copy it before advancing.
+        """
+        freqs, starts, lengths = self.note_table(phrase)
+        total = int(lengths.sum())
+        for offset in range(0, total, self.block_samples):
+            block = self._block[:min(self.block_samples, total - offset)]
+            self._render_into(block, offset, freqs, starts, lengths)
+            yield block
+
+    def stream_blocks(self, events):
+        """Endless fixed-size int16 blocks from an iterator of (frequency_hz, duration_ms) pairs.
+
+        Only the notes overlapping the current block are kept, so memory is constant for an
+        endless event stream. Stops (after a shorter final block) only if events runs out.
+        The same buffer is reused for every block, as in iter_blocks.
+        """
+        window = collections.deque() # (frequency_hz, start_sample, length_samples)
+        events = iter(events)
+        block_start = next_note_start = 0
+        exhausted = False
+        while True:
+            block_end = block_start + self.block_samples
+            while next_note_start < block_end and not exhausted:
+                try:
+                    frequency_hz, duration_ms = next(events)
+                except StopIteration:
+                    exhausted = True
+                    break
+                length = int(duration_ms) * self.sample_rate // 1000
+                if length > 0:
+                    window.append((frequency_hz, next_note_start, length))
+                    next_note_start += length
+            while window and window[0][1] + window[0][2] <= block_start:
+                window.popleft()
+
+            end = min(block_end, next_note_start)
+            if end <= block_start:
+                return
+            freqs, starts, lengths = (np.array(column) for column in zip(*window))
+            block = self._block[:end - block_start]
+            self._render_into(block, block_start, freqs.astype(np.float64), starts.astype(np.int64), lengths.astype(np.int64))
+            yield block
+            block_start = end
+
+
+def open_wav_writer(target, sample_rate, num_samples):
+    """Opens a mono 16-bit wave writer on a path or binary file object ('-' means stdout).
+
+    num_samples is declared up front so the header is correct even on a pipe that can't seek.
+    """
+    if target == "-":
+        target = sys.stdout.buffer
+    writer = wave.open(target, "wb")
+    writer.setnchannels(1)
+    writer.setsampwidth(2)
+    writer.setframerate(sample_rate)
+    writer.setnframes(num_samples)
+    return writer
+
+
+def render_phrases_to_wav(phrases, target, renderer=None):
+    """Streams several phrases back to back into one WAV file. Returns the number of samples written."""
+    renderer = renderer or PhraseRenderer()
+    num_samples = sum(int(renderer.note_table(p)[2].sum()) for p in phrases)
+    writer = open_wav_writer(target, renderer.sample_rate, num_samples)
+    try:
+        for phrase in phrases:
+            for block in renderer.iter_blocks(phrase):
+                writer.writeframesraw(block.astype("<i2", copy=False).tobytes()) # Header is already final, so never seek
+    finally:
+        writer.close()
+    return num_samples
+
+
+def benchmark(renderer, num_phrases, notes_per_phrase, seed):
+    random.seed(seed)
+    phrases = [music.generate_music_phrase_markov(num_notes=notes_per_phrase) for _ in range(num_phrases)]
+    total = sum(int(renderer.note_table(p)[2].sum()) for p in phrases)
+    out = np.empty(total, dtype=np.int16) # Preallocated once, phrases are rendered into views of it
+
+    start = time.perf_counter()
+    offset = 0
+    for phrase in phrases:
+        offset += len(renderer.render(phrase, out=out[offset:]))
+    elapsed = time.perf_counter() - start
+    audio_seconds = total / renderer.sample_rate
+    return audio_seconds, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render Markov-generated phrases to a WAV file without real-time playback.")
+    parser.add_argument("-o", "--output", default="phrases.wav", help="WAV path, or '-' to stream to stdout.")
+    parser.add_argument("--phrases", type=int, default=4)
+    parser.add_argument("--notes", type=int, default=music.BEATS_PER_MEASURE * 2, help="Notes per phrase.")
+    parser.add_argument("--sample-rate", type=int, default=DEFAULT_SAMPLE_RATE)
+    parser.add_argument("--waveform", choices=WAVEFORMS, default="sine")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--benchmark", action="store_true", help="Render without writing and report the real-time factor.")
+    args = parser.parse_args()
+
+    renderer = PhraseRenderer(sample_rate=args.sample_rate, waveform=args.waveform)
+    if args.benchmark:
+        audio_seconds, elapsed = benchmark(renderer, args.phrases, args.notes, args.seed)
+        print(f"Rendered {audio_seconds:.1f}s of audio in {elapsed:.3f}s "
+              f"(real-time factor {audio_seconds / elapsed:,.0f}x)")
+    else:
+        random.seed(args.seed)
+        phrases = [music.generate_music_phrase_markov(num_notes=args.notes) for _ in range(args.phrases)]
+        num_samples = render_phrases_to_wav(phrases, args.output, renderer)
+        if args.output != "-": # Keep stdout clean for the audio stream
+            print(f"Wrote {num_samples / renderer.sample_rate:.1f}s of audio to {args.output}")
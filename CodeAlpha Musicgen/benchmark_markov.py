@@ -0,0 +1,40 @@
+# benchmark_markov.py
+import argparse
+import random
+import time
+
+import MusicgenRNN as music
+from markov_sampler import MarkovSampler
+
+
+def bench_per_note(total_notes, notes_per_phrase, seed):
+    random.seed(seed)
+    start = time.perf_counter()
+    generated = 0
+    while generated < total_notes:
+        generated += len(music.generate_music_phrase_markov(num_notes=notes_per_phrase, start_note_idx=0))
+    return generated / (time.perf_counter() - start)
+
+
+def bench_vectorized(total_notes, notes_per_phrase, seed):
+    sampler = MarkovSampler.from_weight_table(music.transition_matrix, music.num_scale_notes, seed=seed)
+    durations = tuple(music.DURATIONS_MS.values())
+    num_phrases = max(1, total_notes // notes_per_phrase)
+    start = time.perf_counter()
+    note_idx, _ = sampler.sample_phrases(notes_per_phrase, num_phrases=num_phrases, start_idx=0, durations_ms=durations)
+    return note_idx.size / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Markov note sampling throughput: per-note Python path vs NumPy sampler.")
+    parser.add_argument("--notes", type=int, default=2_000_000, help="Total notes generated by the vectorized sampler.")
+    parser.add_argument("--baseline-notes", type=int, default=200_000, help="Total notes for the (slow) per-note path.")
+    parser.add_argument("--phrase-lengths", type=int, nargs="+", default=[8, 1000, 2_000_000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'notes/phrase':>12} | {'per-note (notes/s)':>19} | {'vectorized (notes/s)':>21} | speedup")
+    for length in args.phrase_lengths:
+        baseline = bench_per_note(args.baseline_notes, min(length, args.baseline_notes), args.seed)
+        vectorized = bench_vectorized(args.notes, min(length, args.notes), args.seed)
+        print(f"{length:>12} | {baseline:>19,.0f} | {vectorized:>21,.0f} | {vectorized / baseline:6.1f}x")
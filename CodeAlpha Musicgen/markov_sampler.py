@@ -0,0 +1,128 @@
+# markov_sampler.py
+import numpy as np
+
+REST_IDX = -1 # Marks a rest in sampled note-index arrays
+SCAN_BLOCK = 64 # Steps composed in parallel per block; blocks are then chained sequentially
+
+
+def transition_probabilities(weight_table, num_states):
+    """Turns a {from_idx: [(to_idx, weight), ...]} table into a dense row-stochastic matrix."""
+    probs = np.zeros((num_states, num_states), dtype=np.float64)
+    for from_idx, options in weight_table.items():
+        to_idx, weights = zip(*options)
+        np.add.at(probs[from_idx], list(to_idx), weights)
+
+    row_sums = probs.sum(axis=1, keepdims=True)
+    empty_rows = row_sums[:, 0] == 0
+    probs[empty_rows] = 1.0 # Unknown states fall back to a uniform jump, like get_next_note_markov
+    row_sums[empty_rows] = num_states
+    return probs / row_sums
+
+
+class MarkovSampler:
+    """Samples many notes / phrases at once from a dense transition matrix (inverse-CDF)."""
+
+    def __init__(self, probs, seed=None):
+        probs = np.asarray(probs, dtype=np.float64)
+        if probs.ndim != 2 or probs.shape[0] != probs.shape[1]:
+            raise ValueError(f"Transition matrix must be square, got shape {probs.shape}")
+        self.num_states = probs.shape[0]
+        self.probs = probs / probs.sum(axis=1, keepdims=True)
+
+        self.cdf = np.cumsum(self.probs, axis=1)
+        self.cdf[:, -1] = 1.0 # Guard against rounding leaving the last bucket short
+        # Row s is shifted by +s so one searchsorted call can serve every row at once
+        self._flat_cdf = (self.cdf + np.arange(self.num_states)[:, None]).ravel()
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_weight_table(cls, weight_table, num_states, seed=None):
+        return cls(transition_probabilities(weight_table, num_states), seed=seed)
+
+    def seed(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def _next_state_tables(self, u):
+        """For each uniform draw, the next state from *every* current state: shape u.shape + (S,)."""
+        offsets = np.arange(self.num_states)
+        next_states = np.searchsorted(self._flat_cdf, u[..., None] + offsets, side="right") - offsets * self.num_states
+        np.clip(next_states, 0, self.num_states - 1, out=next_states)
+        return next_states.astype(np.int32)
+
+    def _walk(self, start_idx, u):
+        """Runs chains for u.shape == (phrases, steps); returns the state *after* each step."""
+        num_phrases, steps = u.shape
+        block = min(SCAN_BLOCK, max(1, steps)) # Short phrases shouldn't pay for padding
+        num_blocks = -(-steps // block)
+        padded = np.full((num_phrases, num_blocks * block), 0.5)
+        padded[:, :steps] = u
+        tables = self._next_state_tables(padded.reshape(num_phrases * num_blocks, block))
+
+        # Prefix-compose the per-step transition functions inside each block (Hillis-Steele
+        # scan), so tables[b, t] maps a block's entry state to its state after t + 1 steps.
+        shift = 1
+        while shift < block:
+            tables[:, shift:] = np.take_along_axis(tables[:, shift:], tables[:, :-shift], axis=2)
+            shift *= 2
+        tables = tables.reshape(num_phrases, num_blocks, block, self.num_states)
+
+        # Stitch blocks together: only one Python step per block, vectorized across phrases
+        entry = np.empty((num_phrases, num_blocks), dtype=np.int32)
+        state = start_idx.astype(np.int32)
+        phrase_rows = np.arange(num_phrases)
+        for b in range(num_blocks):
+            entry[:, b] = state
+            state = tables[phrase_rows, b, -1, state]
+
+        states = np.take_along_axis(tables, entry[:, :, None, None], axis=3)[..., 0]
+        return states.reshape(num_phrases, -1)[:, :steps]
+
+    def _start_indices(self, start_idx, num_phrases):
+        if start_idx is None:
+            return self.rng.integers(0, self.num_states, size=num_phrases)
+        start = np.broadcast_to(np.asarray(start_idx, dtype=np.int64), (num_phrases,))
+        if np.any((start < 0) | (start >= self.num_states)):
+            raise ValueError(f"start_idx must be in [0, {self.num_states})")
+        return start
+
+    def sample_notes(self, num_notes, num_phrases=1, start_idx=None):
+        """Pure melody: (num_phrases, num_notes) note indices, each row starting at its start note."""
+        start = self._start_indices(start_idx, num_phrases)
+        notes = np.empty((num_phrases, num_notes), dtype=np.int32)
+        if num_notes == 0:
+            return notes
+        notes[:, 0] = start
+        if num_notes > 1:
+            notes[:, 1:] = self._walk(start, self.rng.random((num_phrases, num_notes - 1)))
+        return notes
+
+    def sample_phrases(self, num_notes, num_phrases=1, start_idx=None, durations_ms=(500, 1000, 750, 250), rest_prob=0.15):
+        """Vectorized counterpart of generate_music_phrase_markov.
+
+        Returns (note_idx, duration_ms) arrays of shape (num_phrases, num_notes); rests are
+        REST_IDX and get half-length durations. The melody only advances on sounded notes.
+        """
+        start = self._start_indices(start_idx, num_phrases)
+        durations_ms = np.asarray(durations_ms, dtype=np.int32)
+        # One RNG draw covers transitions, rest decisions and rhythm for every note
+        u_step, u_rest, u_dur = self.rng.random((3, num_phrases, num_notes))
+
+        is_rest = u_rest < rest_prob
+        chain = np.empty((num_phrases, num_notes + 1), dtype=np.int32)
+        chain[:, 0] = start
+        if num_notes:
+            chain[:, 1:] = self._walk(start, u_step)
+        # The t-th note plays the chain state after however many sounded notes preceded it
+        sounded_before = np.cumsum(~is_rest, axis=1) - ~is_rest
+        note_idx = np.take_along_axis(chain, sounded_before, axis=1)
+        note_idx[is_rest] = REST_IDX
+
+        duration_ms = durations_ms[(u_dur * len(durations_ms)).astype(np.intp)]
+        duration_ms[is_rest] //= 2
+        return note_idx, duration_ms
+
+
+def to_phrase_tuples(note_idx, duration_ms, scale_notes, octave):
+    """Converts one sampled row back into the [(note_id, duration_ms), ...] format play_phrase_with_sound uses."""
+    return [("Rest" if idx == REST_IDX else f"{scale_notes[idx]}{octave}", int(dur))
+            for idx, dur in zip(note_idx.tolist(), duration_ms.tolist())]
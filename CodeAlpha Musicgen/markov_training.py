@@ -0,0 +1,240 @@
+# markov_training.py
+# Learns order-k Markov models over (pitch, duration) tokens from a directory of MIDI files.
+import argparse
+import bisect
+import random
+import time
+
+import numpy as np
+
+from midi_reader import MidiParseError, iter_midi_files, read_midi_notes
+
+# Pitch classes folded onto the 7-note C major scale used by MusicgenRNN (sharps round down)
+SCALE_DEGREE_BY_PITCH_CLASS = np.array([0, 0, 1, 1, 2, 3, 3, 4, 4, 5, 5, 6])
+NUM_SCALE_DEGREES = 7
+DEFAULT_DURATIONS_MS = (250, 500, 750, 1000)
+CHORD_ONSET_TOLERANCE_MS = 20 # Onsets closer than this are treated as one chord (highest note wins)
+FLUSH_EVERY_NGRAMS = 2_000_000 # Buffered n-gram keys before they are folded into the count tables
+
+
+class MarkovVocabulary:
+    """Tokens are pitch_slot * num_durations + duration_idx; pitch slot num_pitches means a rest."""
+
+    def __init__(self, num_pitches=NUM_SCALE_DEGREES, durations_ms=DEFAULT_DURATIONS_MS):
+        self.num_pitches = int(num_pitches)
+        self.durations_ms = np.asarray(sorted(durations_ms), dtype=np.int32)
+        self.num_durations = len(self.durations_ms)
+        self.rest_slot = self.num_pitches
+        self.size = (self.num_pitches + 1) * self.num_durations
+
+    def encode(self, pitch_idx, duration_idx):
+        """pitch_idx None (or rest_slot) encodes a rest."""
+        slot = self.rest_slot if pitch_idx is None else pitch_idx
+        return slot * self.num_durations + duration_idx
+
+    def decode(self, token):
+        """Returns (pitch_idx or None for a rest, duration_ms)."""
+        slot, duration_idx = divmod(int(token), self.num_durations)
+        return (None if slot == self.rest_slot else slot), int(self.durations_ms[duration_idx])
+
+    def quantize_durations(self, durations_ms):
+        """Index of the nearest allowed duration for each value."""
+        edges = (self.durations_ms[1:] + self.durations_ms[:-1]) / 2.0
+        return np.searchsorted(edges, durations_ms)
+
+
+def melody_tokens(notes, vocab):
+    """Reduces one (start_ms, end_ms, pitch) line to a monophonic token sequence.
+
+    Chords keep their highest note; gaps of at least half the shortest duration become rests.
+    """
+    if not notes:
+        return np.empty(0, dtype=np.int64)
+    notes = np.asarray(notes, dtype=np.float64)
+    starts, ends, pitches = notes[:, 0], notes[:, 1], notes[:, 2].astype(np.int64)
+
+    # Highest pitch per onset group: order by (onset group, pitch) and keep each group's last row
+    group = np.concatenate(([0], np.cumsum(np.diff(starts) > CHORD_ONSET_TOLERANCE_MS)))
+    order = np.lexsort((pitches, group))
+    is_last = np.append(group[order][1:] != group[order][:-1], True)
+    keep = order[is_last]
+    starts, ends, pitches = starts[keep], ends[keep], pitches[keep]
+
+    next_starts = np.append(starts[1:], ends[-1])
+    note_ends = np.minimum(ends, next_starts)
+    note_tokens = vocab.encode(SCALE_DEGREE_BY_PITCH_CLASS[pitches % 12], vocab.quantize_durations(note_ends - starts))
+
+    gaps = next_starts - note_ends
+    has_rest = gaps >= vocab.durations_ms[0] / 2.0
+    rest_tokens = vocab.encode(None, vocab.quantize_durations(gaps))
+
+    tokens = np.stack([note_tokens, rest_tokens], axis=1).ravel()
+    return tokens[np.stack([np.ones_like(has_rest), has_rest], axis=1).ravel()]
+
+
+def _merge_counts(keys_a, counts_a, keys_b, counts_b):
+    keys, inverse = np.unique(np.concatenate([keys_a, keys_b]), return_inverse=True)
+    counts = np.bincount(inverse, weights=np.concatenate([counts_a, counts_b]), minlength=len(keys))
+    return keys, counts.astype(np.uint64)
+
+
+class NgramCounter:
+    """Streams token sequences into sparse (sorted key, count) tables, one per context length."""
+
+    def __init__(self, order, vocab):
+        if vocab.size ** (order + 1) >= 2 ** 63:
+            raise ValueError(f"Order {order} is too high for a vocabulary of {vocab.size} tokens")
+        self.order = order
+        self.vocab = vocab
+        self.tables = [(np.empty(0, np.uint64), np.empty(0, np.uint64)) for _ in range(order + 1)]
+        self._pending = [[] for _ in range(order + 1)]
+        self._pending_size = 0
+        self.num_tokens = 0
+
+    def add_sequence(self, tokens):
+        tokens = np.asarray(tokens, dtype=np.uint64)
+        n = len(tokens)
+        self.num_tokens += n
+        size = np.uint64(self.vocab.size)
+        for context_len in range(self.order + 1):
+            if n <= context_len:
+                break
+            # Key = context tokens followed by the next token, read as a base-vocab number
+            keys = tokens[:n - context_len].copy()
+            for i in range(1, context_len + 1):
+                keys *= size
+                keys += tokens[i:n - context_len + i]
+            self._pending[context_len].append(keys)
+            self._pending_size += len(keys)
+        if self._pending_size >= FLUSH_EVERY_NGRAMS:
+            self.flush()
+
+    def flush(self):
+        for context_len, chunks in enumerate(self._pending):
+            if not chunks:
+                continue
+            new_keys, new_counts = np.unique(np.concatenate(chunks), return_counts=True)
+            self.tables[context_len] = _merge_counts(*self.tables[context_len], new_keys, new_counts.astype(np.uint64))
+            chunks.clear()
+        self._pending_size = 0
+
+    def to_model(self, min_count=1):
+        self.flush()
+        tables = []
+        for keys, counts in self.tables:
+            keep = counts >= min_count
+            tables.append((keys[keep], counts[keep]))
+        return NgramMarkovModel(self.order, self.vocab, tables)
+
+
+class NgramMarkovModel:
+    """Order-k Markov model that backs off to shorter contexts when a context was never seen."""
+
+    def __init__(self, order, vocab, tables):
+        self.order = order
+        self.vocab = vocab
+        self.tables = tables # tables[c] = (sorted uint64 keys, counts) for context length c
+        self._row_cache = {}
+
+    def _row(self, context):
+        """(next_tokens, cumulative_counts) observed after a context tuple, or None."""
+        row = self._row_cache.get(context)
+        if row is None and context not in self._row_cache:
+            keys, counts = self.tables[len(context)]
+            base = 0
+            for token in context:
+                base = base * self.vocab.size + token
+            lo = np.searchsorted(keys, np.uint64(base * self.vocab.size))
+            hi = np.searchsorted(keys, np.uint64((base + 1) * self.vocab.size))
+            if hi > lo:
+                row = ((keys[lo:hi] % np.uint64(self.vocab.size)).tolist(), np.cumsum(counts[lo:hi]).tolist())
+            self._row_cache[context] = row
+        return row
+
+    def next_token(self, history, rng=random, pitch_idx=None):
+        """Samples the next token from the longest seen suffix of history (up to order tokens).
+
+        pitch_idx restricts the draw to tokens with that pitch, e.g. to honour a start note.
+        """
+        history = tuple(history[-self.order:]) if self.order else ()
+        for start in range(len(history) + 1):
+            row = self._row(history[start:])
+            if row is None:
+                continue
+            tokens, cum_counts = row
+            if pitch_idx is not None:
+                allowed = [(t, c) for t, c in zip(tokens, np.diff([0] + cum_counts).tolist())
+                           if t // self.vocab.num_durations == pitch_idx]
+                if not allowed:
+                    continue
+                tokens, counts = zip(*allowed)
+                return rng.choices(tokens, weights=counts, k=1)[0]
+            return tokens[bisect.bisect_right(cum_counts, rng.random() * cum_counts[-1])]
+        # Nothing seen at all (empty model or unseen start pitch): any duration of that pitch
+        slot = pitch_idx if pitch_idx is not None else rng.randrange(self.vocab.num_pitches)
+        return self.vocab.encode(slot, rng.randrange(self.vocab.num_durations))
+
+    def save(self, path):
+        """Writes an uncompressed .npz: one key/count array pair per context length, narrowest dtypes."""
+        arrays = {
+            "order": np.array(self.order),
+            "num_pitches": np.array(self.vocab.num_pitches),
+            "durations_ms": self.vocab.durations_ms,
+        }
+        key_dtype = np.uint32 if self.vocab.size ** (self.order + 1) < 2 ** 32 else np.uint64
+        for context_len, (keys, counts) in enumerate(self.tables):
+            max_count = int(counts.max()) if len(counts) else 0
+            arrays[f"keys_{context_len}"] = keys.astype(key_dtype)
+            arrays[f"counts_{context_len}"] = counts.astype(np.uint16 if max_count < 2 ** 16 else np.uint32 if max_count < 2 ** 32 else np.uint64)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            order = int(data["order"])
+            vocab = MarkovVocabulary(int(data["num_pitches"]), data["durations_ms"].tolist())
+            tables = [(data[f"keys_{c}"].astype(np.uint64), data[f"counts_{c}"].astype(np.uint64))
+                      for c in range(order + 1)]
+        return cls(order, vocab, tables)
+
+
+def train_from_directory(corpus_dir, order=2, vocab=None, min_count=1, verbose=True):
+    """Streams every MIDI file under corpus_dir into an order-k model. Returns (model, stats)."""
+    vocab = vocab or MarkovVocabulary()
+    counter = NgramCounter(order, vocab)
+    stats = {"files": 0, "skipped_files": 0, "notes": 0}
+    start_time = time.perf_counter()
+
+    for path in iter_midi_files(corpus_dir):
+        try:
+            lines = read_midi_notes(path)
+        except (MidiParseError, OSError) as e:
+            stats["skipped_files"] += 1
+            if verbose: print(f"Skipping {path}: {e}")
+            continue
+        stats["files"] += 1
+        for notes in lines.values():
+            stats["notes"] += len(notes)
+            counter.add_sequence(melody_tokens(notes, vocab))
+
+    model = counter.to_model(min_count=min_count)
+    stats["tokens"] = counter.num_tokens
+    stats["seconds"] = time.perf_counter() - start_time
+    stats["notes_per_sec"] = stats["notes"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    return model, stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train an order-k Markov melody model from a directory of MIDI files.")
+    parser.add_argument("corpus_dir", help="Directory searched recursively for .mid/.midi files.")
+    parser.add_argument("-o", "--output", default="markov_model.npz", help="Where to save the model.")
+    parser.add_argument("-k", "--order", type=int, default=2, help="Context length (notes) of the highest-order model.")
+    parser.add_argument("--min-count", type=int, default=1, help="Drop n-grams seen fewer times than this.")
+    args = parser.parse_args()
+
+    model, stats = train_from_directory(args.corpus_dir, order=args.order, min_count=args.min_count)
+    model.save(args.output)
+    print(f"Trained order-{args.order} model on {stats['files']} files ({stats['skipped_files']} skipped): "
+          f"{stats['notes']} notes -> {stats['tokens']} tokens in {stats['seconds']:.2f}s "
+          f"({stats['notes_per_sec']:,.0f} notes/sec).")
+    print(f"Saved to {args.output}")
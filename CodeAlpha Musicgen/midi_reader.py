@@ -0,0 +1,149 @@
+# midi_reader.py
+# Minimal Standard MIDI File reader: just enough to pull note events out of a corpus
+# without an external dependency. One file is parsed at a time so corpora stream.
+import bisect
+import os
+import struct
+
+DRUM_CHANNEL = 9 # General MIDI percussion; has no melodic pitch
+DEFAULT_TEMPO_US = 500000 # 120 BPM, the SMF default until a Set Tempo event says otherwise
+MIDI_EXTENSIONS = (".mid", ".midi")
+
+
+class MidiParseError(ValueError):
+    pass
+
+
+def _read_varlen(data, pos):
+    value = 0
+    for _ in range(4):
+        if pos >= len(data):
+            raise MidiParseError("Truncated variable-length quantity")
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value, pos
+    raise MidiParseError("Variable-length quantity longer than 4 bytes")
+
+
+def _parse_track(data):
+    """Yields (abs_tick, kind, channel, a, b) for note on/off and tempo events in one MTrk chunk."""
+    pos, tick, running_status = 0, 0, None
+    while pos < len(data):
+        delta, pos = _read_varlen(data, pos)
+        tick += delta
+        status = data[pos]
+        if status & 0x80:
+            pos += 1
+        elif running_status is None:
+            raise MidiParseError("Data byte without running status")
+        else:
+            status = running_status
+
+        if status == 0xFF: # Meta event
+            meta_type = data[pos]
+            length, pos = _read_varlen(data, pos + 1)
+            if meta_type == 0x51 and length == 3:
+                yield tick, "tempo", None, int.from_bytes(data[pos:pos + 3], "big"), None
+            elif meta_type == 0x2F: # End of track
+                return
+            pos += length
+            running_status = None
+        elif status in (0xF0, 0xF7): # SysEx
+            length, pos = _read_varlen(data, pos)
+            pos += length
+            running_status = None
+        else:
+            running_status = status
+            kind, channel = status & 0xF0, status & 0x0F
+            if kind in (0xC0, 0xD0): # Program change / channel pressure carry one data byte
+                pos += 1
+                continue
+            a, b = data[pos], data[pos + 1]
+            pos += 2
+            if kind == 0x90 and b > 0:
+                yield tick, "on", channel, a, b
+            elif kind == 0x80 or kind == 0x90: # Note-on with velocity 0 is a note-off
+                yield tick, "off", channel, a, b
+
+
+def _tick_to_ms_converter(tempo_events, ticks_per_beat):
+    """Builds a tick -> milliseconds function from (tick, us_per_beat) tempo changes."""
+    segments = [(0, 0.0, DEFAULT_TEMPO_US)] # (start_tick, start_ms, us_per_beat)
+    for tick, tempo in sorted(tempo_events):
+        start_tick, start_ms, current = segments[-1]
+        ms = start_ms + (tick - start_tick) * current / ticks_per_beat / 1000.0
+        if tick == start_tick:
+            segments[-1] = (tick, start_ms, tempo)
+        else:
+            segments.append((tick, ms, tempo))
+
+    segment_ticks = [seg[0] for seg in segments]
+
+    def to_ms(tick):
+        start_tick, start_ms, tempo = segments[bisect.bisect_right(segment_ticks, tick) - 1]
+        return start_ms + (tick - start_tick) * tempo / ticks_per_beat / 1000.0
+    return to_ms
+
+
+def read_midi_notes(path):
+    """Returns {(track, channel): [(start_ms, end_ms, pitch), ...]} for every melodic note in a file."""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if data[:4] != b"MThd":
+        raise MidiParseError(f"{path}: not a Standard MIDI File")
+    if len(data) < 14:
+        raise MidiParseError(f"{path}: truncated header")
+    header_len = struct.unpack(">I", data[4:8])[0]
+    _, num_tracks, division = struct.unpack(">HHH", data[8:14])
+    if division & 0x8000: # SMPTE timing: frames/sec and ticks/frame, no tempo map needed
+        fps = 256 - (division >> 8)
+        ticks_per_beat = fps * (division & 0xFF) * DEFAULT_TEMPO_US / 1e6
+        honour_tempo = False
+    else:
+        ticks_per_beat = division
+        honour_tempo = True
+    if ticks_per_beat <= 0:
+        raise MidiParseError(f"{path}: invalid time division {division:#06x}")
+
+    pos = 8 + header_len
+    tracks = []
+    while pos + 8 <= len(data) and len(tracks) < num_tracks:
+        chunk_type = data[pos:pos + 4]
+        chunk_len = struct.unpack(">I", data[pos + 4:pos + 8])[0]
+        if chunk_type == b"MTrk":
+            try:
+                tracks.append(list(_parse_track(data[pos + 8:pos + 8 + chunk_len])))
+            except IndexError:
+                raise MidiParseError(f"{path}: truncated track chunk") from None
+        pos += 8 + chunk_len
+
+    tempo_events = [(ev[0], ev[3]) for track in tracks for ev in track if ev[1] == "tempo"] if honour_tempo else []
+    to_ms = _tick_to_ms_converter(tempo_events, ticks_per_beat)
+
+    notes = {}
+    for track_idx, events in enumerate(tracks):
+        sounding = {} # (channel, pitch) -> start tick; overlapping repeats restart the note
+        for tick, kind, channel, pitch, _ in events:
+            if kind == "tempo" or channel == DRUM_CHANNEL:
+                continue
+            key = (channel, pitch)
+            if key in sounding:
+                start = sounding.pop(key)
+                notes.setdefault((track_idx, channel), []).append((to_ms(start), to_ms(tick), pitch))
+            if kind == "on":
+                sounding[key] = tick
+    for line in notes.values():
+        line.sort()
+    return notes
+
+
+def iter_midi_files(corpus_dir):
+    """Walks a directory tree and yields MIDI file paths in a stable order."""
+    for root, dirs, files in os.walk(corpus_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(MIDI_EXTENSIONS):
+                yield os.path.join(root, name)
@@ -0,0 +1,81 @@
+# music_stream.py
+# Headless, endless music generation: note lines or raw PCM blocks on stdout, as fast as the
+# consumer pulls them or paced to real time.
+import argparse
+import itertools
+import random
+import sys
+import time
+
+import MusicgenRNN as music
+
+
+def iter_frequency_events(note_events, octave=music.OCTAVES[0]):
+    """Maps (note_idx, duration_ms) pairs to (frequency_hz, duration_ms); rests are 0 Hz."""
+    for note_idx, duration_ms in note_events:
+        yield music.NOTE_FREQUENCIES.get(music.note_id_for(note_idx, octave), 0), duration_ms
+
+
+class _Pacer:
+    """Sleeps so output never runs ahead of the wall clock by more than the audio already emitted."""
+
+    def __init__(self, speed):
+        self.speed = speed # 1.0 = real time, 2.0 = twice as fast, 0 = unpaced
+        self.start = time.perf_counter()
+        self.emitted_s = 0.0
+
+    def advance(self, seconds):
+        self.emitted_s += seconds
+        if self.speed > 0:
+            delay = self.start + self.emitted_s / self.speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+
+def stream_notes(note_events, pacer, out):
+    for note_idx, duration_ms in note_events:
+        out.write(f"{music.note_id_for(note_idx, music.OCTAVES[0])}\t{duration_ms}\n")
+        out.flush()
+        pacer.advance(duration_ms / 1000.0)
+
+
+def stream_audio(note_events, pacer, out, sample_rate, block_samples):
+    from audio_render import PhraseRenderer # NumPy is only needed for audio output
+    renderer = PhraseRenderer(sample_rate=sample_rate, block_samples=block_samples)
+    for block in renderer.stream_blocks(iter_frequency_events(note_events)):
+        out.write(block.astype("<i2", copy=False).tobytes())
+        out.flush()
+        pacer.advance(len(block) / sample_rate)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream generated music to stdout without prompts (runs until interrupted).")
+    parser.add_argument("--model", default=None, help="Learned model saved by markov_training.py.")
+    parser.add_argument("--audio", action="store_true",
+                        help="Write raw mono signed 16-bit little-endian PCM instead of note lines "
+                             "(e.g. pipe into: aplay -f S16_LE -c 1 -r 22050).")
+    parser.add_argument("--max-notes", type=int, default=0, help="Stop after this many notes (0 = endless).")
+    parser.add_argument("--speed", type=float, default=0.0, help="Pace output: 1.0 = real time, 4.0 = 4x, 0 = as fast as possible.")
+    parser.add_argument("--sample-rate", type=int, default=22050)
+    parser.add_argument("--block-samples", type=int, default=2048, help="Samples per audio block.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    model = None
+    if args.model:
+        from markov_training import NgramMarkovModel
+        model = NgramMarkovModel.load(args.model)
+
+    note_events = music.iter_note_events(model=model)
+    if args.max_notes > 0:
+        note_events = itertools.islice(note_events, args.max_notes)
+
+    pacer = _Pacer(args.speed)
+    try:
+        if args.audio:
+            stream_audio(note_events, pacer, sys.stdout.buffer, args.sample_rate, args.block_samples)
+        else:
+            stream_notes(note_events, pacer, sys.stdout)
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
@@ -0,0 +1,297 @@
+# rnn_model.py
+# A small GRU over (note, duration) tokens, trained and sampled with NumPy only (CPU).
+import argparse
+import random
+import time
+
+import numpy as np
+
+import MusicgenRNN as music
+from markov_training import MarkovVocabulary, melody_tokens
+from midi_reader import MidiParseError, iter_midi_files, read_midi_notes
+
+
+def _sigmoid(x):
+    return 0.5 * (np.tanh(0.5 * x) + 1.0) # Overflow-free form of 1 / (1 + exp(-x))
+
+
+class GRUMusicModel:
+    """Embedding -> single GRU layer -> softmax over MarkovVocabulary tokens."""
+
+    PARAM_NAMES = ("embed", "w_x", "w_h", "b_x", "b_hn", "w_out", "b_out")
+
+    def __init__(self, vocab=None, embed_size=32, hidden_size=128, seed=None):
+        self.vocab = vocab or MarkovVocabulary()
+        self.hidden_size = hidden_size
+        rng = np.random.default_rng(seed)
+        v, e, h = self.vocab.size, embed_size, hidden_size
+        self.params = {
+            "embed": rng.normal(0, 0.1, (v, e)),
+            "w_x": rng.normal(0, 1 / np.sqrt(e), (e, 3 * h)), # Gate order: update z, reset r, candidate n
+            "w_h": rng.normal(0, 1 / np.sqrt(h), (h, 3 * h)),
+            "b_x": np.zeros(3 * h),
+            "b_hn": np.zeros(h),
+            "w_out": rng.normal(0, 1 / np.sqrt(h), (h, v)),
+            "b_out": np.zeros(v),
+        }
+
+    def initial_state(self, batch_size):
+        return np.zeros((batch_size, self.hidden_size))
+
+    def step(self, tokens, hidden):
+        """One GRU step for a batch of tokens. Returns (logits, new_hidden, cache for backprop)."""
+        p, hs = self.params, self.hidden_size
+        x = p["embed"][tokens]
+        gates_x = x @ p["w_x"] + p["b_x"]
+        gates_h = hidden @ p["w_h"]
+        z = _sigmoid(gates_x[:, :hs] + gates_h[:, :hs])
+        r = _sigmoid(gates_x[:, hs:2 * hs] + gates_h[:, hs:2 * hs])
+        hn = gates_h[:, 2 * hs:] + p["b_hn"]
+        n = np.tanh(gates_x[:, 2 * hs:] + r * hn)
+        new_hidden = (1.0 - z) * n + z * hidden
+        logits = new_hidden @ p["w_out"] + p["b_out"]
+        return logits, new_hidden, (tokens, x, hidden, z, r, hn, n, new_hidden)
+
+    def loss_and_grads(self, inputs, targets, hidden=None):
+        """Cross-entropy over a (batch, steps) window with full backprop through time."""
+        p, hs = self.params, self.hidden_size
+        batch, steps = inputs.shape
+        hidden = self.initial_state(batch) if hidden is None else hidden
+        caches, probs = [], []
+        loss = 0.0
+        for t in range(steps):
+            logits, hidden, cache = self.step(inputs[:, t], hidden)
+            logits -= logits.max(axis=1, keepdims=True)
+            exp = np.exp(logits)
+            prob = exp / exp.sum(axis=1, keepdims=True)
+            loss -= np.log(prob[np.arange(batch), targets[:, t]] + 1e-12).sum()
+            caches.append(cache)
+            probs.append(prob)
+
+        grads = {name: np.zeros_like(value) for name, value in p.items()}
+        d_hidden_next = np.zeros((batch, hs))
+        scale = 1.0 / (batch * steps)
+        for t in reversed(range(steps)):
+            tokens, x, h_prev, z, r, hn, n, h = caches[t]
+            d_logits = probs[t]
+            d_logits[np.arange(batch), targets[:, t]] -= 1.0
+            d_logits *= scale
+            grads["w_out"] += h.T @ d_logits
+            grads["b_out"] += d_logits.sum(axis=0)
+            d_h = d_logits @ p["w_out"].T + d_hidden_next
+
+            d_n = d_h * (1.0 - z) * (1.0 - n * n)
+            d_z = d_h * (h_prev - n) * z * (1.0 - z)
+            d_r = d_n * hn * r * (1.0 - r)
+            d_gates_x = np.concatenate([d_z, d_r, d_n], axis=1)
+            d_gates_h = np.concatenate([d_z, d_r, d_n * r], axis=1)
+
+            grads["w_x"] += x.T @ d_gates_x
+            grads["b_x"] += d_gates_x.sum(axis=0)
+            grads["w_h"] += h_prev.T @ d_gates_h
+            grads["b_hn"] += (d_n * r).sum(axis=0)
+            np.add.at(grads["embed"], tokens, d_gates_x @ p["w_x"].T)
+            d_hidden_next = d_h * z + d_gates_h @ p["w_h"].T
+        return loss * scale, grads, hidden
+
+    def sample(self, num_phrases, num_notes, hidden=None, prev_tokens=None, temperature=1.0, top_k=None, rng=None):
+        """Samples num_phrases phrases in parallel.
+
+        hidden / prev_tokens continue from an earlier call (phrase continuity); otherwise every
+        phrase starts from a zero state and a random first token. Returns (tokens, hidden, last_tokens).
+        """
+        rng = rng or np.random.default_rng()
+        hidden = self.initial_state(num_phrases) if hidden is None else hidden
+        v = self.vocab.size
+        tokens = np.empty((num_phrases, num_notes), dtype=np.int64)
+        current = rng.integers(0, v, num_phrases) if prev_tokens is None else np.asarray(prev_tokens)
+        uniforms = rng.random((num_notes, num_phrases)) # One draw for the whole batch of phrases
+        rows = np.arange(num_phrases)
+
+        for t in range(num_notes):
+            logits, hidden, _ = self.step(current, hidden)
+            logits /= max(temperature, 1e-6)
+            if top_k is not None and top_k < v:
+                cutoff = np.partition(logits, v - top_k, axis=1)[:, v - top_k][:, None]
+                logits = np.where(logits >= cutoff, logits, -np.inf)
+            logits -= logits.max(axis=1, keepdims=True)
+            cdf = np.cumsum(np.exp(logits), axis=1)
+            # Inverse-CDF draw per row: count how many cumulative weights the scaled uniform exceeds
+            current = (cdf < (uniforms[t] * cdf[:, -1])[:, None]).sum(axis=1)
+            np.minimum(current, v - 1, out=current)
+            tokens[:, t] = current
+        return tokens, hidden, current
+
+    def save(self, path):
+        np.savez(path, num_pitches=self.vocab.num_pitches, durations_ms=self.vocab.durations_ms,
+                 hidden_size=self.hidden_size, **self.params)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            vocab = MarkovVocabulary(int(data["num_pitches"]), data["durations_ms"].tolist())
+            model = cls(vocab, embed_size=data["embed"].shape[1], hidden_size=int(data["hidden_size"]))
+            model.params = {name: data[name].astype(np.float64) for name in cls.PARAM_NAMES}
+        return model
+
+
+class RNNPhraseGenerator:
+    """Keeps the GRU state of a batch of voices so consecutive phrases continue each other."""
+
+    def __init__(self, model, num_voices=1, temperature=1.0, top_k=None, seed=None):
+        self.model = model
+        self.num_voices = num_voices
+        self.temperature = temperature
+        self.top_k = top_k
+        self.rng = np.random.default_rng(seed)
+        self.reset()
+
+    def reset(self):
+        self.hidden = None
+        self.last_tokens = None
+
+    def next_phrases(self, num_notes, octave=music.OCTAVES[0]):
+        """One [(note_id, duration_ms), ...] phrase per voice, picking up where the last call stopped."""
+        tokens, self.hidden, self.last_tokens = self.model.sample(
+            self.num_voices, num_notes, hidden=self.hidden, prev_tokens=self.last_tokens,
+            temperature=self.temperature, top_k=self.top_k, rng=self.rng)
+        phrases = []
+        for row in tokens.tolist():
+            phrase = []
+            for token in row:
+                pitch_idx, duration_ms = self.model.vocab.decode(token)
+                phrase.append(("Rest" if pitch_idx is None else f"{music.SCALE_NOTES[pitch_idx % music.num_scale_notes]}{octave}", duration_ms))
+            phrases.append(phrase)
+        return phrases
+
+
+class _Adam:
+    def __init__(self, params, lr=3e-3, beta1=0.9, beta2=0.999, eps=1e-8):
+        self.lr, self.beta1, self.beta2, self.eps = lr, beta1, beta2, eps
+        self.m = {k: np.zeros_like(v) for k, v in params.items()}
+        self.v = {k: np.zeros_like(v) for k, v in params.items()}
+        self.t = 0
+
+    def update(self, params, grads):
+        self.t += 1
+        correction1 = 1 - self.beta1 ** self.t
+        correction2 = 1 - self.beta2 ** self.t
+        for name, grad in grads.items():
+            self.m[name] = self.beta1 * self.m[name] + (1 - self.beta1) * grad
+            self.v[name] = self.beta2 * self.v[name] + (1 - self.beta2) * grad * grad
+            params[name] -= self.lr * (self.m[name] / correction1) / (np.sqrt(self.v[name] / correction2) + self.eps)
+
+
+def load_corpus_tokens(corpus_dir, vocab):
+    """All melody lines under corpus_dir as one token stream (lines are simply concatenated)."""
+    chunks = []
+    for path in iter_midi_files(corpus_dir):
+        try:
+            lines = read_midi_notes(path)
+        except (MidiParseError, OSError) as e:
+            print(f"Skipping {path}: {e}")
+            continue
+        chunks.extend(melody_tokens(notes, vocab) for notes in lines.values())
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+
+def train(model, token_stream, epochs=5, batch_size=32, seq_len=32, lr=3e-3, clip_norm=5.0, seed=None, verbose=True):
+    """Truncated-BPTT training on random windows of the token stream. Returns per-epoch mean losses."""
+    if len(token_stream) <= seq_len:
+        raise ValueError(f"Need more than {seq_len} tokens to train, got {len(token_stream)}")
+    rng = np.random.default_rng(seed)
+    optimizer = _Adam(model.params, lr=lr)
+    windows_per_epoch = max(1, (len(token_stream) - 1) // seq_len)
+    batches_per_epoch = max(1, windows_per_epoch // batch_size)
+    offsets = np.arange(seq_len + 1)
+    history = []
+
+    for epoch in range(epochs):
+        start_time = time.perf_counter()
+        total_loss = 0.0
+        for _ in range(batches_per_epoch):
+            starts = rng.integers(0, len(token_stream) - seq_len, batch_size)
+            window = token_stream[starts[:, None] + offsets]
+            loss, grads, _ = model.loss_and_grads(window[:, :-1], window[:, 1:])
+            norm = np.sqrt(sum((g * g).sum() for g in grads.values()))
+            if norm > clip_norm:
+                for g in grads.values():
+                    g *= clip_norm / norm
+            optimizer.update(model.params, grads)
+            total_loss += loss
+        history.append(total_loss / batches_per_epoch)
+        if verbose:
+            elapsed = time.perf_counter() - start_time
+            print(f"Epoch {epoch + 1}/{epochs}: loss {history[-1]:.3f} "
+                  f"({batches_per_epoch * batch_size * seq_len / elapsed:,.0f} tokens/sec)")
+    return history
+
+
+def benchmark(model, notes_per_phrase, batch_sizes, repeats, seed):
+    """Milliseconds per phrase: batched GRU sampling vs generate_music_phrase_markov one phrase at a time."""
+    random.seed(seed)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        music.generate_music_phrase_markov(num_notes=notes_per_phrase)
+    markov_ms = (time.perf_counter() - start) * 1000 / repeats
+    print(f"{'Markov (per phrase)':>22}: {markov_ms:8.4f} ms/phrase")
+
+    for batch in batch_sizes:
+        generator = RNNPhraseGenerator(model, num_voices=batch, top_k=8, seed=seed)
+        rounds = max(1, repeats // batch)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            generator.next_phrases(notes_per_phrase)
+        rnn_ms = (time.perf_counter() - start) * 1000 / (rounds * batch)
+        print(f"{f'GRU batch={batch}':>22}: {rnn_ms:8.4f} ms/phrase ({rnn_ms / markov_ms:.1f}x Markov)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train / sample / benchmark a NumPy GRU note-and-duration model.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_train = sub.add_parser("train", help="Train on a directory of MIDI files.")
+    p_train.add_argument("corpus_dir")
+    p_train.add_argument("-o", "--output", default="rnn_model.npz")
+    p_train.add_argument("--epochs", type=int, default=5)
+    p_train.add_argument("--hidden", type=int, default=128)
+    p_train.add_argument("--batch-size", type=int, default=32)
+    p_train.add_argument("--seq-len", type=int, default=32)
+    p_train.add_argument("--lr", type=float, default=3e-3)
+    p_train.add_argument("--seed", type=int, default=None)
+
+    p_gen = sub.add_parser("generate", help="Print phrases sampled from a trained model.")
+    p_gen.add_argument("model")
+    p_gen.add_argument("--phrases", type=int, default=2, help="Consecutive phrases per voice (hidden state carries over).")
+    p_gen.add_argument("--voices", type=int, default=1, help="Phrases sampled in parallel per step.")
+    p_gen.add_argument("--notes", type=int, default=music.BEATS_PER_MEASURE * 2)
+    p_gen.add_argument("--temperature", type=float, default=1.0)
+    p_gen.add_argument("--top-k", type=int, default=None)
+    p_gen.add_argument("--seed", type=int, default=None)
+
+    p_bench = sub.add_parser("benchmark", help="Per-phrase latency vs the Markov baseline.")
+    p_bench.add_argument("--model", default=None, help="Trained model; an untrained one is used if omitted.")
+    p_bench.add_argument("--notes", type=int, default=music.BEATS_PER_MEASURE * 2)
+    p_bench.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 256, 1024])
+    p_bench.add_argument("--repeats", type=int, default=2048)
+    p_bench.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "train":
+        model = GRUMusicModel(hidden_size=args.hidden, seed=args.seed)
+        tokens = load_corpus_tokens(args.corpus_dir, model.vocab)
+        print(f"Training on {len(tokens)} tokens.")
+        train(model, tokens, epochs=args.epochs, batch_size=args.batch_size, seq_len=args.seq_len, lr=args.lr, seed=args.seed)
+        model.save(args.output)
+        print(f"Saved to {args.output}")
+    elif args.command == "generate":
+        generator = RNNPhraseGenerator(GRUMusicModel.load(args.model), num_voices=args.voices,
+                                       temperature=args.temperature, top_k=args.top_k, seed=args.seed)
+        for i in range(args.phrases):
+            for voice, phrase in enumerate(generator.next_phrases(args.notes)):
+                print(f"--- Phrase {i + 1}, voice {voice + 1} ---")
+                for note_id, duration_ms in phrase:
+                    print(f"  {note_id:<4} {duration_ms}ms")
+    else:
+        model = GRUMusicModel.load(args.model) if args.model else GRUMusicModel(seed=args.seed)
+        benchmark(model, args.notes, args.batch_sizes, args.repeats, args.seed)
@@ -2,9 +2,15 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 from translation_logic import LanguageTranslatorApp, SORTED_LANGUAGES_GOOGLE
-import threading
+import os
+import sys
 import pyperclip
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Shared ui_dispatcher.py lives in the repo root
+from ui_dispatcher import UIDispatcher
+
+LIVE_DEBOUNCE_MS = 600 # Wait this long after the last keystroke before translating
+
 class TranslatorGUI:
     def __init__(self, master):
         self.master = master
@@ -13,6 +19,10 @@ class TranslatorGUI:
         master.configure(bg="#f0f0f0")
 
         self.translator_app = LanguageTranslatorApp()
+        # One reusable worker; results come back to the Tk thread through the dispatcher
+        self.dispatcher = UIDispatcher(master, max_workers=1, name="translator")
+        self._last_request_key = None
+        self._debounce_job = None
         self.languages = SORTED_LANGUAGES_GOOGLE
         self.language_names = list(self.languages.values())
         self.language_codes = list(self.languages.keys())
@@ -40,6 +50,8 @@ class TranslatorGUI:
         except ValueError: self.target_lang_combo.current(0)
         self.target_lang_combo.grid(row=0, column=4, padx=5, pady=5)
         
+        self.source_lang_combo.bind("<<ComboboxSelected>>", self.schedule_live_translation)
+        self.target_lang_combo.bind("<<ComboboxSelected>>", self.schedule_live_translation)
         lang_frame.grid_columnconfigure(1, weight=1)
         lang_frame.grid_columnconfigure(4, weight=1)
 
@@ -50,6 +62,7 @@ class TranslatorGUI:
         self.input_text = scrolledtext.ScrolledText(input_area_frame, height=6, wrap=tk.WORD, font=("Arial", 10))
         self.input_text.pack(fill=tk.BOTH, expand=True, pady=(0,5))
         self.input_text.focus()
+        self.input_text.bind("<KeyRelease>", self.schedule_live_translation)
 
         input_btn_frame = tk.Frame(input_area_frame, bg="#f0f0f0")
         input_btn_frame.pack(fill=tk.X)
@@ -59,6 +72,9 @@ class TranslatorGUI:
 
         self.translate_button = tk.Button(master, text="Translate", font=("Arial", 11, "bold"), bg="#4CAF50", fg="white", command=self.perform_translation_threaded)
         self.translate_button.pack(pady=5)
+        self.live_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(master, text="Translate as I type", variable=self.live_var, font=("Arial", 9), bg="#f0f0f0",
+                       command=self.schedule_live_translation).pack()
 
         output_area_frame = tk.Frame(master, bg="#f0f0f0")
         output_area_frame.pack(pady=5, padx=20, fill=tk.BOTH, expand=True)
@@ -75,6 +91,9 @@ class TranslatorGUI:
         self.status_var = tk.StringVar(value="Ready.")
         tk.Label(master, textvariable=self.status_var, bd=1, relief=tk.SUNKEN, anchor=tk.W).pack(side=tk.BOTTOM, fill=tk.X)
 
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
+        master.bind("<F12>", lambda event: self.status_var.set(self.dispatcher.describe()))
+
     def copy_to_clipboard(self, text):
         if not text or text == "Translating...":
             self.status_var.set("Nothing to copy.")
@@ -108,35 +127,60 @@ class TranslatorGUI:
             self.input_text.insert("1.0", out_text)
             self.clear_output() # Clear output as input changed
 
-    def perform_translation_threaded(self):
+    def schedule_live_translation(self, event=None):
+        """Debounces keystrokes: only the last edit within LIVE_DEBOUNCE_MS triggers a request."""
+        if not self.live_var.get(): return
+        if self._debounce_job is not None:
+            self.master.after_cancel(self._debounce_job)
+        self._debounce_job = self.master.after(LIVE_DEBOUNCE_MS, self._run_live_translation)
+
+    def _run_live_translation(self):
+        self._debounce_job = None
+        self.perform_translation_threaded(live=True)
+
+    def perform_translation_threaded(self, live=False):
         text = self.input_text.get("1.0", tk.END).strip()
-        if not text: return
+        if not text:
+            if live: # Input was cleared: a translation still in flight must not refill the output
+                self.dispatcher.cancel("translate")
+                self._last_request_key = None
+                self.clear_output()
+                self.status_var.set("Ready.")
+            return
 
         src_name = self.source_lang_var.get()
         tgt_name = self.target_lang_var.get()
         src_code = "auto" if src_name == "Auto-Detect" else self.language_codes[self.language_names.index(src_name)]
         tgt_code = self.language_codes[self.language_names.index(tgt_name)]
 
-        self.translate_button.config(state=tk.DISABLED)
+        # Coalesce: typing that ends where the last request started doesn't need another call
+        request_key = (text, src_code, tgt_code)
+        if live and request_key == self._last_request_key: return
+        self._last_request_key = request_key
+
         self.status_var.set("Translating...")
-        self.output_text.config(state="normal")
-        self.output_text.delete("1.0", tk.END)
-        self.output_text.insert("1.0", "Translating...")
-        self.output_text.config(state="disabled")
+        if not live: # Placeholder text would flicker on every pause while typing
+            self.output_text.config(state="normal")
+            self.output_text.delete("1.0", tk.END)
+            self.output_text.insert("1.0", "Translating...")
+            self.output_text.config(state="disabled")
 
-        threading.Thread(target=self._execute_translation, args=(text, tgt_code, src_code), daemon=True).start()
+        # Supersedes whatever is queued; a running call finishes but its result is dropped
+        self.dispatcher.submit(self.translator_app.translate_text, text, tgt_code, src_code,
+                               on_done=self._show_translation, key="translate")
 
-    def _execute_translation(self, text, target_code, source_code):
-        translated = self.translator_app.translate_text(text, target_code, source_code)
-        
+    def _show_translation(self, translated):
         self.output_text.config(state="normal")
         self.output_text.delete("1.0", tk.END)
         self.output_text.insert("1.0", translated)
         self.output_text.config(state="disabled")
-        
-        self.translate_button.config(state=tk.NORMAL)
+
         self.status_var.set("Translation complete." if "Error:" not in translated else "Translation failed.")
 
+    def on_close(self):
+        self.dispatcher.shutdown()
+        self.master.destroy()
+
 if __name__ == '__main__':
     try:
         import pyperclip
@@ -3,7 +3,11 @@ import tkinter as tk
 from tkinter import scrolledtext, END 
 from chatbotlogic import FAQChatbotRobust, _NLTK_AVAILABLE 
 import datetime
-import threading
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Shared ui_dispatcher.py lives in the repo root
+from ui_dispatcher import UIDispatcher
 
 class FAQChatbotGUIRobust:
     def __init__(self, master):
@@ -15,6 +19,8 @@ class FAQChatbotGUIRobust:
 
         self.chatbot = None 
         self.default_faq_file = "faqs.json"
+        # Knowledge-base loading and inference run on one worker; widgets are only touched on the Tk thread
+        self.dispatcher = UIDispatcher(master, max_workers=1, name="chatbot")
 
         tk.Label(master, text="AlphaProduct FAQ Bot", font=("Arial", 14, "bold"), bg="#f0f0f0").pack(pady=10)
 
@@ -35,6 +41,8 @@ class FAQChatbotGUIRobust:
         self.send_button.pack(side=tk.RIGHT)
         
         self.configure_tags()
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
+        master.bind("<F12>", lambda event: self.status_label.config(text=self.dispatcher.describe()))
         print("DEBUG: Scheduling initialize_chatbot_threaded")
         self.master.after(100, self.initialize_chatbot_threaded)
         print("DEBUG: FAQChatbotGUIRobust __init__ finished") 
@@ -44,33 +52,38 @@ class FAQChatbotGUIRobust:
         print("DEBUG: initialize_chatbot_threaded started") 
         self.send_button.config(state=tk.DISABLED)
         self.input_field.config(state=tk.DISABLED)
-        threading.Thread(target=self.initialize_chatbot, daemon=True).start()
+        self.dispatcher.submit(self.initialize_chatbot, on_done=self._on_chatbot_ready, on_error=self._on_chatbot_failed)
 
     def initialize_chatbot(self):
+        # Runs on the worker thread: never touch Tk widgets here
         print("DEBUG: initialize_chatbot (in thread) started") 
-        try:
-            self.chatbot = FAQChatbotRobust(faq_file_path=self.default_faq_file)
-            
-            if not _NLTK_AVAILABLE: 
-                self.add_to_chat_history("System", "NLTK advanced features disabled. Using basic text processing.")
-                self.status_label.config(text="Bot ready (basic NLP).")
-            elif self.chatbot.faqs and self.chatbot.question_vectors is not None:
-                self.status_label.config(text="Bot ready (NLTK active).")
-            else:
-                self.status_label.config(text="Error: Chatbot knowledge base failed.")
-                self.add_to_chat_history("System", "Error initializing knowledge base.")
-            
-            self.add_to_chat_history("Bot", "Hello! How can I help with AlphaProduct?")
-        except Exception as e:
-            print(f"ERROR in initialize_chatbot: {e}") 
-            self.status_label.config(text="FATAL ERROR during chatbot init. Check console.")
-            self.add_to_chat_history("System", f"ERROR during init: {e}")
+        return FAQChatbotRobust(faq_file_path=self.default_faq_file)
+
+    def _on_chatbot_ready(self, chatbot):
+        self.chatbot = chatbot
+        if not _NLTK_AVAILABLE: 
+            self.add_to_chat_history("System", "NLTK advanced features disabled. Using basic text processing.")
+            self.status_label.config(text="Bot ready (basic NLP).")
+        elif self.chatbot.faqs and self.chatbot.question_vectors is not None:
+            self.status_label.config(text="Bot ready (NLTK active).")
+        else:
+            self.status_label.config(text="Error: Chatbot knowledge base failed.")
+            self.add_to_chat_history("System", "Error initializing knowledge base.")
+        
+        self.add_to_chat_history("Bot", "Hello! How can I help with AlphaProduct?")
+        self._enable_input()
+        print("DEBUG: initialize_chatbot finished") 
 
+    def _on_chatbot_failed(self, e):
+        print(f"ERROR in initialize_chatbot: {e}") 
+        self.status_label.config(text="FATAL ERROR during chatbot init. Check console.")
+        self.add_to_chat_history("System", f"ERROR during init: {e}")
+        self._enable_input()
 
+    def _enable_input(self):
         self.send_button.config(state=tk.NORMAL)
         self.input_field.config(state=tk.NORMAL)
         self.input_field.focus_set()
-        print("DEBUG: initialize_chatbot (in thread) finished") 
 
 
     def configure_tags(self):
@@ -109,17 +122,25 @@ class FAQChatbotGUIRobust:
         self.add_to_chat_history("You", user_input)
         self.input_field.delete(0, tk.END)
         
+        # Input stays disabled until the answer arrives, so questions are answered one at a time
         self.send_button.config(state=tk.DISABLED)
+        self.input_field.config(state=tk.DISABLED)
         self.status_label.config(text="Bot thinking...")
-        self.master.update_idletasks() 
+        self.dispatcher.submit(self.chatbot.get_response, user_input, on_done=self._show_response, on_error=self._show_response_error)
 
-        bot_response = self.chatbot.get_response(user_input)
+    def _show_response(self, bot_response):
         self.add_to_chat_history("Bot", bot_response)
-        
-        self.send_button.config(state=tk.NORMAL)
         self.status_label.config(text="Bot ready." + (" (basic NLP)" if not _NLTK_AVAILABLE else " (NLTK active)"))
-        self.input_field.config(state=tk.NORMAL)
-        self.input_field.focus_set()
+        self._enable_input()
+
+    def _show_response_error(self, e):
+        self.add_to_chat_history("System", f"Error while answering: {e}")
+        self.status_label.config(text="Bot error. Check console.")
+        self._enable_input()
+
+    def on_close(self):
+        self.dispatcher.shutdown()
+        self.master.destroy()
 
 
 if __name__ == '__main__':
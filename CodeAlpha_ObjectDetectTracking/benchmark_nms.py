@@ -0,0 +1,81 @@
+# benchmark_nms.py
+# Dense-scene post-processing benchmark: the old list + cv2.dnn.NMSBoxes path vs the NumPy path.
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from objdetectlogic import postprocess_detections
+
+NUM_CLASSES = 80
+GRID_SIZES = (13, 26, 52) # YOLOv3 output scales at 416x416
+ANCHORS_PER_CELL = 3
+
+
+def synthetic_yolo_outputs(num_objects, rng, candidates_per_object=8, num_classes=NUM_CLASSES):
+    """YOLOv3-shaped output tensors for a crowded frame: each object fires several jittered, overlapping rows."""
+    rows_per_layer = [g * g * ANCHORS_PER_CELL for g in GRID_SIZES]
+    outs = [rng.random((n, 5 + num_classes), dtype=np.float32) * 0.05 for n in rows_per_layer] # Background noise
+    flat = np.concatenate(outs)
+
+    centers = rng.uniform(0.05, 0.95, (num_objects, 2))
+    sizes = rng.uniform(0.02, 0.15, (num_objects, 2))
+    classes = rng.integers(0, num_classes, num_objects)
+    rows = rng.choice(len(flat), num_objects * candidates_per_object, replace=False)
+    obj = np.repeat(np.arange(num_objects), candidates_per_object)
+    flat[rows, 0:2] = centers[obj] + rng.normal(0, 0.004, (len(rows), 2))
+    flat[rows, 2:4] = sizes[obj] * rng.uniform(0.9, 1.1, (len(rows), 2))
+    flat[rows, 5 + classes[obj]] = rng.uniform(0.5, 1.0, len(rows))
+
+    split = np.cumsum(rows_per_layer)[:-1]
+    return np.split(flat, split)
+
+
+def legacy_postprocess(outs, width, height, conf_threshold, nms_threshold):
+    """The pre-vectorization ObjectDetector.detect post-processing, kept for comparison."""
+    class_ids, confidences, boxes = [], [], []
+    for out in outs:
+        for detection in out:
+            scores = detection[5:]
+            class_id = np.argmax(scores)
+            confidence = scores[class_id]
+            if confidence > conf_threshold:
+                center_x, center_y = int(detection[0] * width), int(detection[1] * height)
+                w, h = int(detection[2] * width), int(detection[3] * height)
+                x, y = int(center_x - w / 2), int(center_y - h / 2)
+                boxes.append([x, y, w, h])
+                confidences.append(float(confidence))
+                class_ids.append(class_id)
+    indices = cv2.dnn.NMSBoxes(boxes, confidences, conf_threshold, nms_threshold)
+    final_indices = indices.flatten() if hasattr(indices, "flatten") else list(indices)
+    return [(boxes[i], confidences[i], class_ids[i]) for i in final_indices]
+
+
+def time_call(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - start) * 1000 / repeats, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark YOLO post-processing on synthetic dense scenes.")
+    parser.add_argument("--objects", type=int, nargs="+", default=[100, 250, 500, 1000])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top-n", type=int, default=None, help="Pre-NMS top-N for the NumPy path.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    width, height, conf, nms = 1280, 720, 0.5, 0.4
+    rng = np.random.default_rng(args.seed)
+    print(f"{'objects':>7} | {'candidates':>10} | {'legacy ms':>9} | {'numpy ms':>8} | {'per-class ms':>12} | kept (legacy/numpy)")
+    for num_objects in args.objects:
+        outs = synthetic_yolo_outputs(num_objects, rng)
+        candidates = int(sum((o[:, 5:].max(axis=1) > conf).sum() for o in outs))
+        legacy_ms, legacy = time_call(lambda: legacy_postprocess(outs, width, height, conf, nms), args.repeats)
+        numpy_ms, (boxes, _, _) = time_call(
+            lambda: postprocess_detections(outs, width, height, conf, nms, pre_nms_top_n=args.top_n), args.repeats)
+        per_class_ms, _ = time_call(
+            lambda: postprocess_detections(outs, width, height, conf, nms, per_class_nms=True, pre_nms_top_n=args.top_n), args.repeats)
+        print(f"{num_objects:>7} | {candidates:>10} | {legacy_ms:>9.2f} | {numpy_ms:>8.2f} | {per_class_ms:>12.2f} | {len(legacy)}/{len(boxes)}")
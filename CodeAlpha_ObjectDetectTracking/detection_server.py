@@ -0,0 +1,377 @@
+# detection_server.py
+# Serves several video sources from one host with a single shared ObjectDetector.
+import argparse
+import collections
+import json
+import os
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+from detection_store import DetectionStore
+from objdetectlogic import ObjectDetector
+
+FPS_WINDOW_S = 5.0 # Sliding window for the per-stream FPS figures
+IDLE_WAIT_S = 0.5 # Longest the scheduler sleeps with no frames pending; new frames and stop() wake it at once
+
+
+class _RateMeter:
+    """Events per second over the last FPS_WINDOW_S seconds."""
+
+    def __init__(self):
+        self.times = collections.deque()
+        self.started = None # First tick; until a full window has passed, only the covered part counts
+
+    def tick(self, now):
+        if self.started is None:
+            self.started = now
+        self.times.append(now)
+        while self.times and now - self.times[0] > FPS_WINDOW_S:
+            self.times.popleft()
+
+    def rate(self, now):
+        while self.times and now - self.times[0] > FPS_WINDOW_S:
+            self.times.popleft()
+        covered = min(FPS_WINDOW_S, now - self.started) if self.started is not None else 0.0
+        return len(self.times) / covered if covered > 0 else 0.0
+
+
+class VideoStream:
+    """Reads one source on its own thread, keeping only the newest frame.
+
+    A frame the scheduler hasn't picked up by the time the next one arrives is dropped, so a
+    slow model never builds a backlog and latency stays bounded.
+    """
+
+    def __init__(self, stream_id, source, realtime_files=True, loop_files=False, store=None):
+        self.stream_id = stream_id
+        self.store = store # Optional DetectionStore that keeps every result of this stream
+        self.source = int(source) if str(source).isdigit() else source # Camera index or file/URL
+        self.realtime_files = realtime_files
+        self.loop_files = loop_files
+        self.lock = threading.Lock()
+        self.frame = None
+        self.frame_id = -1
+        self.frame_time = 0.0
+        self.running = False
+        self.error = None
+        self.frame_ready = None # Event set whenever a frame arrives or the stream ends (shared with the scheduler)
+
+        self.captured = 0
+        self.dropped = 0
+        self.processed = 0
+        self.detection_errors = 0
+        self.last_detection_error = None
+        self.capture_rate = _RateMeter()
+        self.process_rate = _RateMeter()
+        self.last_latency_ms = None
+        self.last_result = None
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self._read_loop, name=f"stream-{self.stream_id}", daemon=True).start()
+
+    def stop(self):
+        self.running = False
+
+    def _read_loop(self):
+        capture = cv2.VideoCapture(self.source)
+        if not capture.isOpened():
+            self.error = f"Cannot open source {self.source!r}"
+            print(f"[{self.stream_id}] {self.error}")
+            self.running = False
+            self._notify()
+            return
+        is_file = isinstance(self.source, str) and not self.source.lower().startswith(("rtsp://", "http://", "https://"))
+        fps = capture.get(cv2.CAP_PROP_FPS) if is_file else 0
+        frame_interval = 1.0 / fps if self.realtime_files and fps and fps > 0 else 0.0
+        next_due = time.perf_counter()
+
+        while self.running:
+            ok, frame = capture.read()
+            if not ok:
+                if is_file and self.loop_files:
+                    capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    continue
+                self.error = "End of stream" if is_file else "Read failed"
+                break
+            if frame_interval: # Play files at their native rate, like a live camera would
+                next_due += frame_interval
+                delay = next_due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            now = time.perf_counter()
+            with self.lock:
+                if self.frame is not None:
+                    self.dropped += 1 # Previous frame was never scheduled
+                self.frame, self.frame_time = frame, now
+                self.frame_id += 1
+                self.captured += 1
+                self.capture_rate.tick(now)
+            self._notify()
+        capture.release()
+        self.running = False
+        self._notify() # One less live stream: a partial batch may not need to wait any more
+
+    def _notify(self):
+        if self.frame_ready is not None:
+            self.frame_ready.set()
+
+    def take_frame(self):
+        """Hands the pending frame to the scheduler (or None)."""
+        with self.lock:
+            frame, frame_id, frame_time = self.frame, self.frame_id, self.frame_time
+            self.frame = None
+        return (frame, frame_id, frame_time) if frame is not None else None
+
+    def record_result(self, frame_id, frame_time, arrays, detections, now):
+        if self.store is not None:
+            self.store.append(frame_id, time.time() - (now - frame_time), *arrays)
+        with self.lock:
+            self.processed += 1
+            self.process_rate.tick(now)
+            self.last_latency_ms = (now - frame_time) * 1000
+            self.last_result = {"stream": self.stream_id, "frame_id": frame_id, "timestamp": time.time(),
+                                "latency_ms": round(self.last_latency_ms, 1), "detections": detections}
+
+    def record_error(self, message):
+        """Notes a frame of this stream that failed in detection or while recording its result."""
+        with self.lock:
+            self.detection_errors += 1
+            self.last_detection_error = message
+
+    def metrics(self, now):
+        with self.lock:
+            return {
+                "stream": self.stream_id,
+                "source": str(self.source),
+                "running": self.running,
+                "error": self.error,
+                "detection_errors": self.detection_errors,
+                "last_detection_error": self.last_detection_error,
+                "captured_frames": self.captured,
+                "processed_frames": self.processed,
+                "dropped_frames": self.dropped,
+                "capture_fps": round(self.capture_rate.rate(now), 2),
+                "processed_fps": round(self.process_rate.rate(now), 2),
+                "last_latency_ms": None if self.last_latency_ms is None else round(self.last_latency_ms, 1),
+            }
+
+
+class DetectionScheduler:
+    """Gathers frames from every stream into micro-batches for one shared detector.
+
+    Each batch takes at most one frame per stream and starts its round-robin scan after the
+    stream served first last time, so a fast camera can't starve the others. A batch is sent as
+    soon as it is full, or max_wait_ms after its first frame arrived.
+    """
+
+    def __init__(self, detector, streams, max_batch=4, max_wait_ms=10):
+        self.detector = detector
+        self.streams = streams
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.running = False
+        self.thread = None
+        self.frame_ready = threading.Event()
+        for stream in streams:
+            stream.frame_ready = self.frame_ready
+        self._next_stream = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_error = None
+        self.frame_rate = _RateMeter() # Ticks once per batched frame
+        self.batch_rate = _RateMeter()
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="detector", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stops scheduling and waits for the batch in flight, so its results are recorded."""
+        self.running = False
+        self.frame_ready.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def _collect_batch(self):
+        batch = []
+        taken = set()
+        deadline = None
+        while self.running and len(batch) < self.max_batch:
+            self.frame_ready.clear() # Before the scan, so a frame arriving during it still wakes the wait below
+            for offset in range(len(self.streams)):
+                idx = (self._next_stream + offset) % len(self.streams)
+                if idx in taken:
+                    continue
+                item = self.streams[idx].take_frame()
+                if item is not None:
+                    batch.append((idx, *item))
+                    taken.add(idx)
+                    if len(batch) >= self.max_batch:
+                        break
+            now = time.perf_counter()
+            if batch and deadline is None:
+                deadline = now + self.max_wait_s
+            live_streams = sum(1 for s in self.streams if s.running)
+            if batch and (now >= deadline or len(taken) >= live_streams):
+                break
+            self.frame_ready.wait(deadline - now if batch else IDLE_WAIT_S)
+        if batch:
+            self._next_stream = (batch[0][0] + 1) % len(self.streams)
+        return batch
+
+    def _run(self):
+        # The only detector thread: a failing batch is logged and charged to its streams, never fatal
+        while self.running:
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            try:
+                results = self.detector.detect_batch([frame for _, frame, _, _ in batch])
+            except Exception as e:
+                self._record_error(e, [idx for idx, _, _, _ in batch])
+                continue
+            now = time.perf_counter()
+            self.batches += 1
+            self.batch_rate.tick(now)
+            for (idx, _, frame_id, frame_time), arrays in zip(batch, results):
+                self.frame_rate.tick(now)
+                try:
+                    self.streams[idx].record_result(frame_id, frame_time, arrays, self.detector.summarize(*arrays), now)
+                except Exception as e:
+                    self._record_error(e, [idx])
+
+    def _record_error(self, exc, stream_indices):
+        message = f"{type(exc).__name__}: {exc}"
+        print(f"Detection error on stream(s) {', '.join(self.streams[i].stream_id for i in stream_indices)}: {message}")
+        traceback.print_exc()
+        self.errors += 1
+        self.last_error = message
+        for idx in stream_indices:
+            self.streams[idx].record_error(message)
+
+    def metrics(self, now):
+        batch_rate = self.batch_rate.rate(now)
+        return {
+            "alive": self.thread is not None and self.thread.is_alive(),
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "batches": self.batches,
+            "batches_per_sec": round(batch_rate, 2),
+            "mean_batch_size": round(self.frame_rate.rate(now) / batch_rate, 2) if batch_rate else 0.0,
+            "max_batch": self.max_batch,
+        }
+
+
+class DetectionService:
+    def __init__(self, sources, max_batch=4, max_wait_ms=10, realtime_files=True, loop_files=False, detector=None, store_dir=None):
+        self.detector = detector or ObjectDetector()
+        self.streams = []
+        for i, src in enumerate(sources):
+            stream_id = f"s{i}"
+            # Segment writes happen on the store's own thread, never inside the detection loop
+            store = (DetectionStore(os.path.join(store_dir, stream_id), class_names=self.detector.classes, background_flush=True)
+                     if store_dir else None)
+            self.streams.append(VideoStream(stream_id, src, realtime_files, loop_files, store))
+        self.scheduler = DetectionScheduler(self.detector, self.streams, max_batch, max_wait_ms)
+
+    def start(self):
+        for stream in self.streams:
+            stream.start()
+        self.scheduler.start()
+
+    def stop(self):
+        """Stops everything and closes the stores; returns the store errors (empty on a clean shutdown)."""
+        self.scheduler.stop() # Returns once no more record_result calls can happen
+        errors = []
+        for stream in self.streams:
+            stream.stop()
+            if stream.store is not None:
+                try:
+                    stream.store.close()
+                except Exception as e:
+                    errors.append(f"[{stream.stream_id}] {e}")
+        return errors
+
+    def find_stream(self, stream_id):
+        return next((s for s in self.streams if s.stream_id == stream_id), None)
+
+    def metrics(self):
+        now = time.perf_counter()
+        return {"scheduler": self.scheduler.metrics(now), "streams": [s.metrics(now) for s in self.streams]}
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        """GET /metrics, /streams/<id>/latest."""
+
+        def _send_json(self, payload, status=200):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parts = [p for p in self.path.split("?")[0].split("/") if p]
+            if parts in (["metrics"], []):
+                self._send_json(service.metrics())
+            elif len(parts) == 3 and parts[0] == "streams" and parts[2] == "latest":
+                stream = service.find_stream(parts[1])
+                if stream is None:
+                    self._send_json({"error": f"Unknown stream '{parts[1]}'"}, 404)
+                else:
+                    with stream.lock:
+                        result = stream.last_result
+                    self._send_json(result or {"stream": stream.stream_id, "detections": None})
+            else:
+                self._send_json({"error": "Not found"}, 404)
+
+        def log_message(self, format, *args):
+            pass # Keep the console for the service's own messages
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run one YOLO detector over several video sources and publish results over HTTP.")
+    parser.add_argument("sources", nargs="+", help="Camera indices (0, 1, ...), video files or stream URLs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=4, help="Most frames per forward pass.")
+    parser.add_argument("--max-wait-ms", type=float, default=10, help="How long a partial batch waits for more frames.")
+    parser.add_argument("--conf", type=float, default=0.5)
+    parser.add_argument("--fast-files", action="store_true", help="Read video files as fast as possible instead of at their native FPS.")
+    parser.add_argument("--loop", action="store_true", help="Restart video files when they end.")
+    parser.add_argument("--store", default=None, help="Directory to keep every stream's detections in (one DetectionStore per stream).")
+    args = parser.parse_args()
+
+    detector = ObjectDetector(conf_thresh=args.conf)
+    if detector.net is None:
+        print("Detector failed to load; check the 'yolo_model' folder.")
+        raise SystemExit(1)
+
+    service = DetectionService(args.sources, args.max_batch, args.max_wait_ms,
+                               realtime_files=not args.fast_files, loop_files=args.loop, detector=detector, store_dir=args.store)
+    service.start()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"Serving {len(service.streams)} stream(s) on http://{args.host}:{args.port}/metrics "
+          f"and /streams/<id>/latest (ids: {', '.join(s.stream_id for s in service.streams)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        store_errors = service.stop()
+    if store_errors:
+        print("Shutdown lost stored detections:")
+        for message in store_errors:
+            print(f"  {message}")
+        raise SystemExit(1)
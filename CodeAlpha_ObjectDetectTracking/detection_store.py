@@ -0,0 +1,343 @@
+# detection_store.py
+# Append-only columnar store for detections, indexed by class and time.
+#
+# Layout of a store directory:
+#   meta.json        class names
+#   segments.jsonl   one line per flushed segment: rows, time range, per-class row offsets
+#   seg_000000/      one .npy file per column, rows sorted by (class_id, timestamp)
+# Segments are never rewritten; a query skips segments whose time range or class counts rule
+# them out, then memory-maps only the columns it needs and slices them with searchsorted.
+import argparse
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+
+COLUMNS = {
+    "frame_id": np.int64,
+    "timestamp": np.float64, # Seconds (wall clock for live streams, media position for files)
+    "class_id": np.int16,
+    "score": np.float32,
+    "box": np.int32, # (rows, 4) x, y, w, h
+}
+DEFAULT_FLUSH_ROWS = 8192
+
+
+class StoreWriteError(OSError):
+    """A background segment write failed; its rows are lost."""
+
+
+class DetectionStore:
+    """Columnar detection store. With background_flush, segments are sorted and written on a
+    writer thread, so append() never stalls the caller (e.g. the detection loop) on disk I/O.
+    """
+
+    def __init__(self, path, class_names=None, flush_rows=DEFAULT_FLUSH_ROWS, background_flush=False):
+        self.path = path
+        self.flush_rows = flush_rows
+        self._lock = threading.Lock() # Guards the pending buffers and the segment list
+        self._write_lock = threading.Lock() # Serializes segment files and manifest lines
+        os.makedirs(path, exist_ok=True)
+
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                self.class_names = json.load(f)["class_names"]
+        elif class_names is None:
+            raise ValueError(f"'{path}' is not a detection store yet; class_names are needed to create one")
+        else:
+            self.class_names = list(class_names)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"class_names": self.class_names}, f)
+        self.num_classes = len(self.class_names)
+
+        self.segments = []
+        manifest_path = os.path.join(path, "segments.jsonl")
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                self.segments = [json.loads(line) for line in f if line.strip()]
+        self._next_segment = len(self.segments)
+        self._pending = {name: [] for name in COLUMNS}
+        self._pending_rows = 0
+        self._queued_rows = 0 # Taken from the buffers but not yet in a written segment
+        self._write_error = None # First failed background write, raised by the next flush() / close()
+        self.lost_rows = 0
+
+        self._write_queue = None
+        if background_flush:
+            self._write_queue = queue.Queue()
+            self._writer = threading.Thread(target=self._write_loop, name="detection-store-writer", daemon=True)
+            self._writer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        """Rows stored so far, flushed or not."""
+        with self._lock:
+            return sum(seg["rows"] for seg in self.segments) + self._queued_rows + self._pending_rows
+
+    def append(self, frame_id, timestamp, boxes, scores, class_ids):
+        """Buffers one frame's detections (arrays from ObjectDetector.postprocess / detect_batch)."""
+        n = len(scores)
+        if n == 0:
+            return
+        batch = None
+        with self._lock:
+            self._pending["frame_id"].append(np.full(n, frame_id, dtype=COLUMNS["frame_id"]))
+            self._pending["timestamp"].append(np.full(n, timestamp, dtype=COLUMNS["timestamp"]))
+            self._pending["class_id"].append(np.asarray(class_ids, dtype=COLUMNS["class_id"]))
+            self._pending["score"].append(np.asarray(scores, dtype=COLUMNS["score"]))
+            self._pending["box"].append(np.asarray(boxes, dtype=COLUMNS["box"]).reshape(n, 4))
+            self._pending_rows += n
+            if self._pending_rows >= self.flush_rows:
+                batch = self._take_pending_locked()
+        if batch is not None:
+            self._submit(batch)
+
+    def flush(self):
+        """Writes buffered rows; with background_flush, also waits for earlier segments to land.
+
+        Raises StoreWriteError if a background write failed since the last flush.
+        """
+        with self._lock:
+            batch = self._take_pending_locked()
+        if batch is not None:
+            self._submit(batch)
+        if self._write_queue is not None:
+            self._write_queue.join()
+            with self._lock:
+                error, self._write_error = self._write_error, None
+            if error is not None:
+                raise error
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            if self._write_queue is not None and self._writer.is_alive():
+                self._write_queue.put(None)
+                self._writer.join()
+
+    def _take_pending_locked(self):
+        """Detaches the buffered rows as (segment_name, chunks, rows), or None if there are none."""
+        if not self._pending_rows:
+            return None
+        batch = (f"seg_{self._next_segment:06d}", self._pending, self._pending_rows)
+        self._next_segment += 1
+        self._queued_rows += self._pending_rows
+        self._pending = {name: [] for name in COLUMNS}
+        self._pending_rows = 0
+        return batch
+
+    def _submit(self, batch):
+        if self._write_queue is not None:
+            self._write_queue.put(batch)
+        else:
+            self._write_batch(*batch)
+
+    def _write_loop(self):
+        while True:
+            batch = self._write_queue.get()
+            try:
+                if batch is None:
+                    return
+                self._write_batch(*batch)
+            except Exception as e:
+                print(f"Error writing detection segment {batch[0]} to '{self.path}': {e}")
+                with self._lock:
+                    if self._write_error is None:
+                        self._write_error = StoreWriteError(f"Writing segment {batch[0]} to '{self.path}' failed, "
+                                                            f"{batch[2]} rows lost: {e}")
+                        self._write_error.__cause__ = e
+            finally:
+                self._write_queue.task_done()
+
+    def _write_batch(self, segment_name, chunks, rows):
+        try:
+            entry = self._write_segment(segment_name, chunks)
+        except Exception:
+            with self._lock:
+                self._queued_rows -= rows
+                self.lost_rows += rows
+            raise
+        with self._lock:
+            self.segments.append(entry)
+            self._queued_rows -= rows
+
+    def _write_segment(self, segment_name, chunks):
+        columns = {name: np.concatenate(parts) for name, parts in chunks.items()}
+        order = np.lexsort((columns["timestamp"], columns["class_id"]))
+        columns = {name: values[order] for name, values in columns.items()}
+
+        class_counts = np.bincount(columns["class_id"], minlength=self.num_classes)
+        entry = {
+            "name": segment_name,
+            "rows": int(len(order)),
+            "t_min": float(columns["timestamp"].min()),
+            "t_max": float(columns["timestamp"].max()),
+            "class_offsets": np.concatenate(([0], np.cumsum(class_counts))).tolist(),
+        }
+        with self._write_lock:
+            segment_dir = os.path.join(self.path, segment_name)
+            os.makedirs(segment_dir, exist_ok=True)
+            for name, values in columns.items():
+                np.save(os.path.join(segment_dir, f"{name}.npy"), values)
+            # The manifest line is written last, so a crash mid-flush never exposes a partial segment
+            with open(os.path.join(self.path, "segments.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        return entry
+
+    def class_id(self, class_name_or_id):
+        if isinstance(class_name_or_id, (int, np.integer)):
+            return int(class_name_or_id)
+        try:
+            return self.class_names.index(class_name_or_id)
+        except ValueError:
+            raise ValueError(f"Unknown class '{class_name_or_id}'") from None
+
+    def query(self, classes=None, start=None, end=None, min_score=None, columns=tuple(COLUMNS)):
+        """Rows with class in classes (names or ids; None = all) and start <= timestamp <= end.
+
+        Returns {column: array}, ordered by class then time. Unflushed rows are not included.
+        """
+        class_ids = range(self.num_classes) if classes is None else sorted({self.class_id(c) for c in classes})
+        start = -np.inf if start is None else start
+        end = np.inf if end is None else end
+        parts = {name: [] for name in columns}
+
+        with self._lock:
+            segments = list(self.segments)
+        for seg in segments:
+            if seg["t_max"] < start or seg["t_min"] > end:
+                continue
+            offsets = seg["class_offsets"]
+            ranges = [(offsets[c], offsets[c + 1]) for c in class_ids if c < self.num_classes and offsets[c + 1] > offsets[c]]
+            if not ranges:
+                continue
+            seg_dir = os.path.join(self.path, seg["name"])
+            timestamps = np.load(os.path.join(seg_dir, "timestamp.npy"), mmap_mode="r")
+            # Within one class the rows are time-sorted, so the time range is two binary searches
+            rows = []
+            for lo, hi in ranges:
+                t = timestamps[lo:hi]
+                rows.append(np.arange(lo + np.searchsorted(t, start, "left"), lo + np.searchsorted(t, end, "right")))
+            rows = np.concatenate(rows)
+            if min_score is not None and len(rows):
+                rows = rows[np.load(os.path.join(seg_dir, "score.npy"), mmap_mode="r")[rows] >= min_score]
+            if not len(rows):
+                continue
+            for name in columns:
+                parts[name].append(np.load(os.path.join(seg_dir, f"{name}.npy"), mmap_mode="r")[rows])
+
+        return {name: (np.concatenate(chunks) if chunks else np.empty((0, 4) if name == "box" else 0, COLUMNS[name]))
+                for name, chunks in parts.items()}
+
+    def frames_with(self, class_name_or_id, start=None, end=None, min_score=None):
+        """(frame_ids, timestamps) of frames that contained the class, sorted by frame id then time.
+
+        Frame ids restart at 0 on every server run, so a frame is a (frame_id, timestamp) pair.
+        """
+        rows = self.query([class_name_or_id], start, end, min_score, columns=("frame_id", "timestamp"))
+        frame_ids, timestamps = rows["frame_id"], rows["timestamp"]
+        order = np.lexsort((timestamps, frame_ids))
+        frame_ids, timestamps = frame_ids[order], timestamps[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (frame_ids[1:] != frame_ids[:-1]) | (timestamps[1:] != timestamps[:-1])
+        return frame_ids[first], timestamps[first]
+
+    def count_by_class(self, start=None, end=None):
+        """{class_name: detections} in a time range; whole segments inside it are counted from the manifest."""
+        start = -np.inf if start is None else start
+        end = np.inf if end is None else end
+        counts = np.zeros(self.num_classes, dtype=np.int64)
+        with self._lock:
+            segments = list(self.segments)
+        for seg in segments:
+            if seg["t_max"] < start or seg["t_min"] > end:
+                continue
+            if start <= seg["t_min"] and seg["t_max"] <= end:
+                counts += np.diff(seg["class_offsets"])
+                continue
+            seg_dir = os.path.join(self.path, seg["name"])
+            timestamps = np.load(os.path.join(seg_dir, "timestamp.npy"), mmap_mode="r")
+            class_ids = np.load(os.path.join(seg_dir, "class_id.npy"), mmap_mode="r")
+            in_range = (timestamps >= start) & (timestamps <= end)
+            counts += np.bincount(class_ids[in_range], minlength=self.num_classes)
+        return {self.class_names[c]: int(n) for c, n in enumerate(counts) if n}
+
+
+def record_video(video_path, store, detector, every_nth=1):
+    """Runs the detector over a video file and stores every detection, timestamped by media position.
+
+    Frame ids and media positions restart for every video, so the store must be empty: two
+    recordings in one store could not be told apart.
+    """
+    if len(store):
+        raise ValueError(f"Store '{store.path}' already holds {len(store)} detections; record each video into a new store")
+    import cv2
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise IOError(f"Cannot open video {video_path!r}")
+    frame_id = 0
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            if frame_id % every_nth == 0:
+                timestamp = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+                (boxes, scores, class_ids), = detector.detect_batch([frame])
+                store.append(frame_id, timestamp, boxes, scores, class_ids)
+            frame_id += 1
+    finally:
+        capture.release()
+        store.flush()
+    return frame_id
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record detections from footage and query them by class and time.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_record = sub.add_parser("record", help="Detect objects in a video file and append them to a store.")
+    p_record.add_argument("video")
+    p_record.add_argument("store")
+    p_record.add_argument("--every-nth", type=int, default=1, help="Only process every n-th frame.")
+
+    p_query = sub.add_parser("query", help="Frames that contained a class, optionally in a time range (seconds).")
+    p_query.add_argument("store")
+    p_query.add_argument("--class", dest="class_name", default=None, help="e.g. person; omit for per-class counts.")
+    p_query.add_argument("--start", type=float, default=None)
+    p_query.add_argument("--end", type=float, default=None)
+    p_query.add_argument("--min-score", type=float, default=None)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        from objdetectlogic import ObjectDetector
+        detector = ObjectDetector()
+        if detector.net is None:
+            print("Detector failed to load; check the 'yolo_model' folder.")
+            raise SystemExit(1)
+        with DetectionStore(args.store, class_names=detector.classes) as store:
+            try:
+                frames = record_video(args.video, store, detector, args.every_nth)
+            except ValueError as e:
+                print(f"Error: {e}")
+                raise SystemExit(1)
+        print(f"Processed {frames} frames into {args.store}")
+    else:
+        store = DetectionStore(args.store)
+        if args.class_name is None:
+            for name, count in sorted(store.count_by_class(args.start, args.end).items(), key=lambda kv: -kv[1]):
+                print(f"{name:<15} {count}")
+        else:
+            frame_ids, timestamps = store.frames_with(args.class_name, args.start, args.end, args.min_score)
+            print(f"{len(frame_ids)} frame(s) contained '{args.class_name}'")
+            for frame_id, timestamp in zip(frame_ids.tolist(), timestamps.tolist()):
+                print(f"  frame {frame_id:>8}  t={timestamp:10.3f}s")
@@ -3,10 +3,14 @@ import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 from PIL import Image, ImageTk
 import cv2
-import threading
+import os
+import sys
 import numpy as np
 from objdetectlogic import ObjectDetector 
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Shared ui_dispatcher.py lives in the repo root
+from ui_dispatcher import UIDispatcher
+
 class ObjectDetectionApp:
     def __init__(self, master_window):
         self.master = master_window
@@ -15,6 +19,8 @@ class ObjectDetectionApp:
         master_window.configure(bg="#e0e0e0")
 
         self.detector = ObjectDetector()
+        # One worker: the network is not safe to run from two threads, and frames must not pile up
+        self.dispatcher = UIDispatcher(master_window, max_workers=1, name="detector")
         
         self.webcam_active = False
         self.video_capture = None
@@ -42,6 +48,7 @@ class ObjectDetectionApp:
     
 
         self.master.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.master.bind("<F12>", lambda event: self.status_bar.config(text=self.dispatcher.describe()))
         
         if self.detector.net is None: 
             self.status_bar.config(text="ERROR: YOLO Model not loaded. Check 'yolo_model' folder.")
@@ -85,13 +92,25 @@ class ObjectDetectionApp:
         self.status_bar.config(text="Processing image...")
         self.upload_button.config(state=tk.DISABLED)
         self.webcam_btn.config(state=tk.DISABLED)
-        threading.Thread(target=self._process_static_image_task, args=(pil_image,), daemon=True).start()
+        # Dragging the slider re-submits under the same key, so only the latest threshold is shown
+        self.dispatcher.submit(self._process_static_image_task, pil_image, self._display_size(),
+                               on_done=self._show_static_result, on_error=self._static_image_failed, key="static")
 
-    def _process_static_image_task(self, pil_image):
+    def _process_static_image_task(self, pil_image, display_size):
+        # Runs on the worker thread: never touch Tk widgets here
         cv_image = cv2.cvtColor(np.array(pil_image.convert('RGB')), cv2.COLOR_RGB2BGR)
         processed_frame, detected_info = self.detector.detect(cv_image)
-        self.display_image(processed_frame)
-        self.status_bar.config(text=f"Image processed. Found {len(detected_info)} objects.")
+        return self._prepare_image(processed_frame, display_size), len(detected_info)
+
+    def _show_static_result(self, result):
+        pil_img, num_objects = result
+        self.show_image(pil_img)
+        self.status_bar.config(text=f"Image processed. Found {num_objects} objects.")
+        self.upload_button.config(state=tk.NORMAL)
+        self.webcam_btn.config(state=tk.NORMAL)
+
+    def _static_image_failed(self, e):
+        self.status_bar.config(text=f"Error processing image: {e}")
         self.upload_button.config(state=tk.NORMAL)
         self.webcam_btn.config(state=tk.NORMAL)
 
@@ -125,27 +144,50 @@ class ObjectDetectionApp:
     def _update_webcam_feed(self):
         if not self.webcam_active or not self.video_capture or not self.video_capture.isOpened(): return
         ret, frame = self.video_capture.read()
-        if ret:
-            frame_flipped = cv2.flip(frame, 1)
-            processed_frame, _ = self.detector.detect(frame_flipped) 
-            self.display_image(processed_frame)
-        if self.webcam_active: 
+        if not ret:
             self.master.after(20, self._update_webcam_feed)
+            return
+        # One frame in flight at a time: the next one is read only after this one is shown
+        self.dispatcher.submit(self._process_webcam_frame, frame, self._display_size(),
+                               on_done=self._show_webcam_frame, on_error=self._webcam_frame_failed, key="webcam")
+
+    def _process_webcam_frame(self, frame, display_size):
+        # Runs on the worker thread: never touch Tk widgets here
+        processed_frame, _ = self.detector.detect(cv2.flip(frame, 1))
+        return self._prepare_image(processed_frame, display_size)
+
+    def _show_webcam_frame(self, pil_img):
+        if not self.webcam_active: return
+        self.show_image(pil_img)
+        self.master.after(20, self._update_webcam_feed)
+
+    def _webcam_frame_failed(self, e):
+        if not self.webcam_active: return
+        self.status_bar.config(text=f"Webcam detection error: {e}")
+        self.master.after(20, self._update_webcam_feed)
+
+    def _display_size(self):
+        w, h = self.image_label.winfo_width(), self.image_label.winfo_height()
+        if w < 2 or h < 2: w, h = 780, 580 
+        return w, h
 
-    def display_image(self, cv_image_bgr):
+    def _prepare_image(self, cv_image_bgr, display_size):
+        """BGR frame -> PIL image scaled to fit display_size. Safe to call off the Tk thread."""
         cv_image_rgb = cv2.cvtColor(cv_image_bgr, cv2.COLOR_BGR2RGB)
         pil_img = Image.fromarray(cv_image_rgb)
-        
-        w, h = self.image_label.winfo_width(), self.image_label.winfo_height()
-        if w < 2 or h < 2: w, h = 780, 580 
+        w, h = display_size
         pil_img.thumbnail((w - 10, h - 10), Image.Resampling.LANCZOS)
-        
+        return pil_img
+
+    def show_image(self, pil_img):
         imgtk = ImageTk.PhotoImage(image=pil_img)
         self.image_label.imgtk = imgtk 
         self.image_label.config(image=imgtk)
 
     def on_close(self):
-        if self.webcam_active and self.video_capture: 
+        self.webcam_active = False
+        self.dispatcher.shutdown()
+        if self.video_capture: 
             self.video_capture.release()
         self.master.destroy()
 
@@ -4,8 +4,108 @@ import numpy as np
 import os
 # Removed time import as it wasn't used in this simplified version
 
+def decode_yolo_outputs(outs, width, height, conf_threshold, class_mask=None):
+    """Vectorized decode of YOLO output layers into (boxes xywh int32, confidences float32, class_ids int32)."""
+    detections = np.concatenate([out.reshape(-1, out.shape[-1]) for out in outs]) if len(outs) else np.empty((0, 85), np.float32)
+    scores = detections[:, 5:]
+    class_ids = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(scores)), class_ids]
+    keep = confidences > conf_threshold
+    if class_mask is not None:
+        keep &= class_mask[class_ids]
+
+    detections, confidences, class_ids = detections[keep], confidences[keep], class_ids[keep]
+    # Same truncating int conversions as the original per-detection loop
+    centers_x = (detections[:, 0] * width).astype(np.int32)
+    centers_y = (detections[:, 1] * height).astype(np.int32)
+    widths = (detections[:, 2] * width).astype(np.int32)
+    heights = (detections[:, 3] * height).astype(np.int32)
+    boxes = np.stack([(centers_x - widths / 2).astype(np.int32), (centers_y - heights / 2).astype(np.int32), widths, heights], axis=1)
+    return boxes, confidences.astype(np.float32), class_ids.astype(np.int32)
+
+
+NMS_CHUNK = 128 # Boxes resolved together per step of the chunked greedy NMS
+
+
+def _overlaps(corners, areas, rows, cols, iou_threshold):
+    """(len(rows), len(cols)) bool matrix of IoU > threshold, without a division."""
+    inter_w = np.minimum(corners[rows, None, 2], corners[None, cols, 2]) - np.maximum(corners[rows, None, 0], corners[None, cols, 0])
+    inter_h = np.minimum(corners[rows, None, 3], corners[None, cols, 3]) - np.maximum(corners[rows, None, 1], corners[None, cols, 1])
+    np.maximum(inter_w, 0, out=inter_w)
+    np.maximum(inter_h, 0, out=inter_h)
+    inter_w *= inter_h
+    # inter / (area_a + area_b - inter) > t  <=>  inter * (1 + t) > t * (area_a + area_b)
+    inter_w *= 1 + iou_threshold
+    return inter_w > iou_threshold * (areas[rows, None] + areas[None, cols])
+
+
+def nms_boxes(boxes, scores, iou_threshold, class_ids=None, top_n=None):
+    """Greedy NMS on (N, 4) xywh boxes; returns kept indices, highest score first.
+
+    With class_ids, boxes only suppress boxes of the same class (batched NMS: each class is
+    suppressed on its own, so crowded scenes never compare boxes across classes).
+    top_n keeps only the N highest-scoring boxes before suppression.
+    """
+    if len(scores) == 0:
+        return np.empty(0, dtype=np.intp)
+    order = np.argsort(-scores, kind="stable")
+    if top_n is not None:
+        order = order[:top_n]
+
+    if class_ids is not None:
+        ordered_classes = class_ids[order]
+        kept = [order[ordered_classes == c][_greedy_nms(boxes[order[ordered_classes == c]], iou_threshold)]
+                for c in np.unique(ordered_classes)]
+        kept = np.concatenate(kept)
+        return kept[np.argsort(-scores[kept], kind="stable")]
+    return order[_greedy_nms(boxes[order], iou_threshold)]
+
+
+def _greedy_nms(boxes, iou_threshold):
+    """NMS for boxes already sorted by descending score; returns kept positions."""
+    boxes = boxes.astype(np.float32) # Pixel coordinates; float32 halves the memory traffic of the pairwise tests
+    corners = np.concatenate([boxes[:, :2], boxes[:, :2] + boxes[:, 2:]], axis=1)
+    areas = boxes[:, 2] * boxes[:, 3]
+
+    # Same result as suppressing one box at a time, but score-ordered chunks are resolved with
+    # matrix ops: first against everything already kept, then among themselves.
+    kept = np.empty(0, dtype=np.intp)
+    for start in range(0, len(boxes), NMS_CHUNK):
+        chunk = np.arange(start, min(len(boxes), start + NMS_CHUNK))
+        if kept.size:
+            chunk = chunk[~_overlaps(corners, areas, kept, chunk, iou_threshold).any(axis=0)]
+        if not chunk.size:
+            continue
+        suppresses = np.triu(_overlaps(corners, areas, chunk, chunk, iou_threshold), k=1)
+        # Box j survives iff no *surviving* higher-scored box suppresses it; iterating from
+        # "all survive" settles the greedy answer in as many rounds as the longest chain.
+        survives = np.ones(len(chunk), dtype=bool)
+        while True:
+            updated = ~(suppresses & survives[:, None]).any(axis=0)
+            if np.array_equal(updated, survives):
+                break
+            survives = updated
+        kept = np.concatenate([kept, chunk[survives]])
+    return kept
+
+
+def postprocess_detections(outs, width, height, conf_threshold, nms_threshold, class_mask=None, per_class_nms=False, pre_nms_top_n=None):
+    """Decode + class filter + NMS, all on NumPy arrays. Returns (boxes, confidences, class_ids)."""
+    boxes, confidences, class_ids = decode_yolo_outputs(outs, width, height, conf_threshold, class_mask)
+    kept = nms_boxes(boxes, confidences, nms_threshold, class_ids=class_ids if per_class_nms else None, top_n=pre_nms_top_n)
+    return boxes[kept], confidences[kept], class_ids[kept]
+
+
+def _batch_item(out, index, batch_size):
+    """Rows of one image from a batched YOLO output: (batch, rows, 85) or rows stacked as (batch * rows, 85)."""
+    if out.ndim == 3:
+        return out[index]
+    rows = len(out) // batch_size
+    return out[index * rows:(index + 1) * rows]
+
+
 class ObjectDetector:
-    def __init__(self, conf_thresh=0.5, nms_thresh=0.4):
+    def __init__(self, conf_thresh=0.5, nms_thresh=0.4, per_class_nms=False, pre_nms_top_n=None, allowed_classes=None):
         model_dir = "yolo_model"
         weights_path = os.path.join(model_dir, "yolov3.weights")
         config_path = os.path.join(model_dir, "yolov3.cfg")
@@ -62,6 +162,11 @@ class ObjectDetector:
 
         self.confidence_threshold = conf_thresh
         self.nms_threshold = nms_thresh
+        self.per_class_nms = per_class_nms # False matches cv2.dnn.NMSBoxes: boxes of any class suppress each other
+        self.pre_nms_top_n = pre_nms_top_n # Keep only the N highest-scoring candidates before NMS
+        self.class_mask = None
+        if allowed_classes:
+            self.set_allowed_classes(allowed_classes)
 
     def detect(self, frame):
         if self.net is None: # Check if network loaded
@@ -73,47 +178,59 @@ class ObjectDetector:
         self.net.setInput(blob)
         outs = self.net.forward(self.output_layers_names) # Use the processed names
 
-        class_ids, confidences, boxes = [], [], []
-        for out in outs:
-            for detection in out:
-                scores = detection[5:]
-                class_id = np.argmax(scores)
-                confidence = scores[class_id]
-                if confidence > self.confidence_threshold:
-                    center_x, center_y = int(detection[0] * width), int(detection[1] * height)
-                    w, h = int(detection[2] * width), int(detection[3] * height)
-                    x, y = int(center_x - w / 2), int(center_y - h / 2)
-                    boxes.append([x, y, w, h])
-                    confidences.append(float(confidence))
-                    class_ids.append(class_id)
-
-        indices = cv2.dnn.NMSBoxes(boxes, confidences, self.confidence_threshold, self.nms_threshold)
-        
-        final_indices = []
-        if hasattr(indices, 'flatten'): # Check if it's a NumPy array that can be flattened
-            final_indices = indices.flatten()
-        elif isinstance(indices, (list, tuple)) and len(indices) > 0 : # If it's a non-empty list/tuple
-            # If it's a list of lists like [[0], [2]], flatten it
-            if all(isinstance(sub, (list, tuple, np.ndarray)) and len(sub) == 1 for sub in indices):
-                final_indices = [item[0] for item in indices]
-            else: # Assume it's already a flat list of indices
-                final_indices = list(indices)
-        # If indices is empty or None, final_indices remains empty
-
+        boxes, confidences, class_ids = self.postprocess(outs, width, height)
 
         detected_objects_summary = []
-        for i in final_indices:
-            x, y, w, h = boxes[i]
-            label = str(self.classes[class_ids[i]])
-            color = self.colors[class_ids[i]]
+        for (x, y, w, h), confidence, class_id in zip(boxes.tolist(), confidences.tolist(), class_ids.tolist()):
+            label = str(self.classes[class_id])
+            color = self.colors[class_id]
             cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
-            cv2.putText(frame, f"{label} {confidences[i]*100:.0f}%", (x, y - 8), self.font, 0.6, color, 2)
-            detected_objects_summary.append({"label": label, "confidence": confidences[i], "box": (x,y,w,h)})
+            cv2.putText(frame, f"{label} {confidence*100:.0f}%", (x, y - 8), self.font, 0.6, color, 2)
+            detected_objects_summary.append({"label": label, "confidence": confidence, "box": (x,y,w,h)})
         return frame, detected_objects_summary
 
+    def detect_batch(self, frames):
+        """One forward pass over several frames (no drawing).
+
+        Returns a (boxes, confidences, class_ids) tuple of arrays per frame, in input order.
+        """
+        if self.net is None or not frames:
+            return [(np.empty((0, 4), np.int32), np.empty(0, np.float32), np.empty(0, np.int32)) for _ in frames]
+
+        blob = cv2.dnn.blobFromImages(frames, 0.00392, (416, 416), (0, 0, 0), True, crop=False)
+        self.net.setInput(blob)
+        outs = self.net.forward(self.output_layers_names)
+
+        results = []
+        for i, frame in enumerate(frames):
+            height, width = frame.shape[:2]
+            results.append(self.postprocess([_batch_item(out, i, len(frames)) for out in outs], width, height))
+        return results
+
+    def summarize(self, boxes, confidences, class_ids):
+        """Same dicts detect() returns, for arrays from postprocess()/detect_batch()."""
+        return [{"label": str(self.classes[class_id]), "confidence": confidence, "box": tuple(box)}
+                for box, confidence, class_id in zip(boxes.tolist(), confidences.tolist(), class_ids.tolist())]
+
+    def postprocess(self, outs, width, height):
+        """Raw YOLO outputs -> (boxes, confidences, class_ids) arrays after filtering and NMS."""
+        return postprocess_detections(outs, width, height, self.confidence_threshold, self.nms_threshold,
+                                      class_mask=self.class_mask, per_class_nms=self.per_class_nms,
+                                      pre_nms_top_n=self.pre_nms_top_n)
+
     # Added for compatibility with GUI if settings are updated
     def set_confidence_threshold(self, threshold):
         self.confidence_threshold = float(threshold)
 
     def set_nms_threshold(self, threshold):
-        self.nms_threshold = float(threshold)
\ No newline at end of file
+        self.nms_threshold = float(threshold)
+
+    def set_allowed_classes(self, class_names):
+        """Only keep these coco.names classes (dropped before NMS). None or empty keeps every class."""
+        if not class_names:
+            self.class_mask = None
+            return
+        unknown = [name for name in class_names if name not in self.classes]
+        if unknown:
+            raise ValueError(f"Unknown class name(s): {', '.join(unknown)}")
+        self.class_mask = np.isin(np.array(self.classes), list(class_names))
\ No newline at end of file
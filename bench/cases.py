@@ -0,0 +1,168 @@
+# cases.py
+# Benchmark cases, one group per tool. Every group takes (quick, workdir) and returns
+# [(case_name, run), ...] where run() returns a metrics dict; a group raises ImportError when its
+# tool's dependencies are missing. Scratch files go under workdir, which the runner cleans up.
+import contextlib
+import io
+import os
+import random
+import tempfile
+
+import numpy as np
+
+import fixtures
+from harness import measure, measure_import
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Swallows the DEBUG / status prints some modules emit, so they neither flood nor slow the run."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def translator_cases(quick, workdir):
+    with _quiet():
+        from translation_logic import LanguageTranslatorApp
+    app = LanguageTranslatorApp()
+    texts = fixtures.translation_texts(50 if quick else 500)
+    chars = sum(len(t) for t in texts)
+
+    def translate_batch():
+        for text in texts:
+            app.translate_text(text, "fr")
+
+    return [
+        ("translator.import", lambda: measure_import("translation_logic")),
+        # The backend is the offline stub, so this is the app's own per-request overhead
+        ("translator.translate_text", lambda: measure(translate_batch, 5 if quick else 20, chars, unit="chars")),
+    ]
+
+
+def chatbot_cases(quick, workdir):
+    with _quiet():
+        from chatbotlogic import FAQChatbotRobust
+    sizes = (100, 1000) if quick else (100, 1000, 5000)
+    cases = [("chatbot.import", lambda: measure_import("chatbotlogic"))]
+
+    for size in sizes:
+        path = fixtures.write_faq_file(workdir, size)
+        queries = fixtures.faq_queries(fixtures.generate_faqs(size), 40 if quick else 200)
+
+        def build(path=path):
+            with _quiet():
+                return FAQChatbotRobust(faq_file_path=path)
+
+        def answer_all(path=path, queries=queries):
+            bot = build(path)
+            with _quiet():
+                return measure(lambda: [bot.get_response(q) for q in queries], 3 if quick else 10, len(queries), unit="queries")
+
+        cases.append((f"chatbot.build_{size}", lambda build=build, size=size: measure(build, 2 if quick else 5, size, unit="faqs")))
+        cases.append((f"chatbot.get_response_{size}", answer_all))
+    return cases
+
+
+def musicgen_cases(quick, workdir):
+    with _quiet():
+        import MusicgenRNN as music
+        from audio_render import PhraseRenderer
+        from markov_sampler import MarkovSampler
+        from markov_training import MarkovVocabulary, NgramCounter
+        from rnn_model import GRUMusicModel
+    notes_per_phrase = music.BEATS_PER_MEASURE * 2
+    num_phrases = 100 if quick else 1000
+
+    def per_note():
+        random.seed(0)
+        for _ in range(num_phrases):
+            music.generate_music_phrase_markov(num_notes=notes_per_phrase, start_note_idx=0)
+
+    sampler = MarkovSampler.from_weight_table(music.transition_matrix, music.num_scale_notes, seed=0)
+    durations = tuple(music.DURATIONS_MS.values())
+
+    def vectorized():
+        sampler.seed(0)
+        sampler.sample_phrases(notes_per_phrase, num_phrases=num_phrases * 10, start_idx=0, durations_ms=durations)
+
+    vocab = MarkovVocabulary()
+    tokens = fixtures.melody_tokens(vocab.size, 100_000 if quick else 1_000_000)
+
+    def count_ngrams():
+        counter = NgramCounter(2, vocab)
+        counter.add_sequence(tokens)
+        counter.to_model()
+
+    model = GRUMusicModel(vocab, seed=0)
+    rnn_batch = 16
+
+    def rnn_sample():
+        model.sample(rnn_batch, notes_per_phrase * 4, rng=np.random.default_rng(0))
+
+    renderer = PhraseRenderer()
+    random.seed(0)
+    phrases = [music.generate_music_phrase_markov(num_notes=notes_per_phrase, start_note_idx=0) for _ in range(20)]
+    # Throughput unit is seconds of audio per second of work, i.e. the real-time factor
+    audio_seconds = sum(int(renderer.note_table(p)[2].sum()) for p in phrases) / renderer.sample_rate
+
+    def render():
+        for phrase in phrases:
+            renderer.render(phrase)
+
+    return [
+        ("musicgen.import", lambda: measure_import("MusicgenRNN")),
+        ("musicgen.markov_per_note", lambda: measure(per_note, 3 if quick else 10, num_phrases * notes_per_phrase, unit="notes")),
+        ("musicgen.markov_vectorized", lambda: measure(vectorized, 3 if quick else 10, num_phrases * 10 * notes_per_phrase, unit="notes")),
+        ("musicgen.ngram_count", lambda: measure(count_ngrams, 3 if quick else 5, len(tokens), unit="tokens")),
+        ("musicgen.rnn_sample", lambda: measure(rnn_sample, 3 if quick else 10, rnn_batch * notes_per_phrase * 4, unit="notes")),
+        ("musicgen.render", lambda: measure(render, 3 if quick else 10, audio_seconds, unit="audio_s")),
+    ]
+
+
+def objdetect_cases(quick, workdir):
+    with _quiet():
+        from detection_store import DetectionStore
+        from objdetectlogic import postprocess_detections
+    cases = [("objdetect.import", lambda: measure_import("objdetectlogic"))]
+
+    for num_objects in ((100, 500) if quick else (100, 500, 1000)):
+        frames = fixtures.yolo_frames(num_objects)
+
+        def postprocess(frames=frames):
+            for outs in frames:
+                postprocess_detections(outs, 1280, 720, 0.5, 0.4)
+
+        cases.append((f"objdetect.postprocess_{num_objects}",
+                      lambda postprocess=postprocess, n=len(frames): measure(postprocess, 3 if quick else 10, n, unit="frames")))
+
+    num_classes = 80
+    rows = fixtures.detection_rows(900 if quick else 9000, 20, num_classes) # 30 s / 5 min of a busy 30 FPS feed
+    class_names = [f"class{i}" for i in range(num_classes)]
+
+    def store_append():
+        with tempfile.TemporaryDirectory(dir=workdir) as path:
+            with DetectionStore(path, class_names=class_names) as store:
+                for frame in rows:
+                    store.append(*frame)
+
+    store_dir = os.path.join(workdir, "detections")
+    with DetectionStore(store_dir, class_names=class_names) as store:
+        for frame in rows:
+            store.append(*frame)
+    duration = rows[-1][1]
+
+    def store_query():
+        for c in range(0, num_classes, 8):
+            store.frames_with(c, start=duration * 0.25, end=duration * 0.75)
+
+    cases.append(("objdetect.store_append", lambda: measure(store_append, 3 if quick else 5, len(rows) * 20, unit="rows")))
+    cases.append(("objdetect.store_query", lambda: measure(store_query, 5 if quick else 20, len(range(0, num_classes, 8)), unit="queries")))
+    return cases
+
+
+COMPONENTS = {
+    "translator": translator_cases,
+    "chatbot": chatbot_cases,
+    "musicgen": musicgen_cases,
+    "objdetect": objdetect_cases,
+}
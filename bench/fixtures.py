@@ -0,0 +1,97 @@
+# fixtures.py
+# Deterministic synthetic inputs: the same seed always produces byte-identical data.
+import json
+import os
+import random
+
+import numpy as np
+
+SYLLABLES = ["al", "pha", "pro", "duct", "in", "stall", "ac", "count", "set", "tings", "net", "work", "sync", "cloud",
+             "pay", "ment", "lic", "ense", "up", "date", "back", "log", "file", "port", "ex", "mo", "bile", "ver", "sion", "key"]
+QUESTION_TEMPLATES = [
+    "How do I {verb} my {noun}?",
+    "What is the {noun} {noun2}?",
+    "Can I {verb} the {noun} on {noun2}?",
+    "Why does {noun} fail to {verb}?",
+    "Where can I find {noun} {noun2} settings?",
+    "Is there a way to {verb} {noun} without {noun2}?",
+]
+VERBS = ["install", "update", "reset", "export", "sync", "cancel", "share", "restore", "configure", "remove", "upgrade", "verify"]
+GREETINGS = ["hello", "hi", "hey"]
+
+
+def _make_words(rng, count):
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))))
+    return sorted(words)
+
+
+def generate_faqs(num_faqs, seed=0):
+    """num_faqs question/answer pairs in the faqs.json format, drawn from a seeded synthetic vocabulary."""
+    rng = random.Random(seed)
+    nouns = _make_words(rng, max(50, num_faqs // 4))
+    faqs = []
+    for i in range(num_faqs):
+        question = rng.choice(QUESTION_TEMPLATES).format(verb=rng.choice(VERBS), noun=rng.choice(nouns), noun2=rng.choice(nouns))
+        answer = " ".join(rng.choice(nouns) for _ in range(rng.randint(8, 20))).capitalize() + "."
+        faqs.append({"id": i + 1, "question": question, "answer": answer})
+    return faqs
+
+
+def write_faq_file(directory, num_faqs, seed=0):
+    path = os.path.join(directory, f"faqs_{num_faqs}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(generate_faqs(num_faqs, seed), f)
+    return path
+
+
+def faq_queries(faqs, num_queries, seed=0):
+    """A query mix: reworded FAQ questions (hits), greetings and unrelated text (fallbacks)."""
+    rng = random.Random(seed)
+    queries = []
+    for i in range(num_queries):
+        kind = i % 4
+        if kind == 3:
+            queries.append(rng.choice(GREETINGS) if rng.random() < 0.5 else "completely unrelated words here")
+            continue
+        words = rng.choice(faqs)["question"].rstrip("?").split()
+        if kind == 1 and len(words) > 3:
+            del words[rng.randrange(len(words))] # Dropped word
+        elif kind == 2:
+            rng.shuffle(words) # Same words, different order
+        queries.append(" ".join(words) + "?")
+    return queries
+
+
+def translation_texts(num_texts, seed=0):
+    """Sentences of 5..60 words, like what a user types into the translator box."""
+    rng = random.Random(seed)
+    words = _make_words(rng, 500)
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(5, 60))) for _ in range(num_texts)]
+
+
+def yolo_frames(num_objects, num_frames=4, seed=0):
+    """Raw YOLOv3 output tensors of crowded frames (see benchmark_nms.synthetic_yolo_outputs)."""
+    from benchmark_nms import synthetic_yolo_outputs
+    rng = np.random.default_rng(seed)
+    return [synthetic_yolo_outputs(num_objects, rng) for _ in range(num_frames)]
+
+
+def detection_rows(num_frames, detections_per_frame, num_classes, seed=0):
+    """(frame_id, timestamp, boxes, scores, class_ids) per frame of a 30 FPS feed."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for frame_id in range(num_frames):
+        boxes = rng.integers(0, 600, (detections_per_frame, 4)).astype(np.int32)
+        scores = rng.uniform(0.5, 1.0, detections_per_frame).astype(np.float32)
+        class_ids = rng.integers(0, num_classes, detections_per_frame)
+        frames.append((frame_id, frame_id / 30.0, boxes, scores, class_ids))
+    return frames
+
+
+def melody_tokens(vocab_size, num_tokens, seed=0):
+    """A random walk over token ids, so n-gram tables get realistic repetition."""
+    rng = np.random.default_rng(seed)
+    steps = rng.integers(-3, 4, num_tokens)
+    return np.mod(np.cumsum(steps), vocab_size).astype(np.int64)
@@ -0,0 +1,134 @@
+# harness.py
+# Timing, memory and import-time measurement plus baseline comparison for the bench suite.
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stubs")
+COMPONENT_DIRS = {
+    "translator": os.path.join(REPO_ROOT, "CodeAlpha Translator"),
+    "chatbot": os.path.join(REPO_ROOT, "CodeAlpha_FAQchatbot"),
+    "musicgen": os.path.join(REPO_ROOT, "CodeAlpha Musicgen"),
+    "objdetect": os.path.join(REPO_ROOT, "CodeAlpha_ObjectDetectTracking"),
+}
+# Stubs come first so no component can reach the network
+SEARCH_PATH = [STUBS_DIR] + list(COMPONENT_DIRS.values())
+
+# Metrics checked for regressions, by direction of "better". p90 / p99 are reported but not
+# checked: with a handful of iterations they are a single sample and mostly scheduler noise.
+HIGHER_IS_BETTER = {"throughput"}
+LOWER_IS_BETTER = {"p50_ms", "peak_mem_mb", "import_s"}
+# Changes smaller than these are timer / allocator noise, whatever the relative difference
+MIN_ABSOLUTE_CHANGE = {"p50_ms": 0.05, "peak_mem_mb": 0.5, "import_s": 0.02}
+
+
+def install_search_path():
+    for path in reversed(SEARCH_PATH):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def measure(fn, iterations, items_per_call=1, warmup=1, unit="items"):
+    """Times fn() iterations times; returns throughput (items/s), latency percentiles and peak memory.
+
+    Peak memory comes from one extra traced call, so tracemalloc overhead never skews the timings.
+    """
+    for _ in range(warmup):
+        fn()
+    gc.collect()
+
+    latencies = []
+    total_start = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    total_s = time.perf_counter() - total_start
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "throughput": items_per_call * iterations / total_s if total_s > 0 else float("inf"),
+        "unit": f"{unit}/s",
+        "iterations": iterations,
+        "p50_ms": percentile(latencies, 0.50),
+        "p90_ms": percentile(latencies, 0.90),
+        "p99_ms": percentile(latencies, 0.99),
+        "peak_mem_mb": peak / 2 ** 20,
+    }
+
+
+def measure_import(module_name, repeats=3):
+    """Cold import time of a module, in a fresh interpreter each time (best of repeats)."""
+    code = ("import sys, time; sys.path[:0] = %r; t = time.perf_counter(); import %s; "
+            "sys.stdout.flush(); sys.stderr.write('%%r\\n' %% (time.perf_counter() - t))") % (SEARCH_PATH, module_name)
+    best = None
+    for _ in range(repeats):
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=REPO_ROOT)
+        if proc.returncode != 0:
+            raise ImportError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"Cannot import {module_name}")
+        elapsed = float(proc.stderr.strip().splitlines()[-1])
+        best = elapsed if best is None else min(best, elapsed)
+    return {"import_s": best}
+
+
+def environment_info():
+    info = {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.processor(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    try:
+        import numpy
+        info["numpy"] = numpy.__version__
+    except ImportError:
+        pass
+    return info
+
+
+def save_results(results, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(current, baseline, tolerance):
+    """Lists regressions: metrics that got worse than the baseline by more than tolerance (a fraction)."""
+    regressions = []
+    for case, metrics in current["results"].items():
+        base = baseline.get("results", {}).get(case)
+        if not base or "skipped" in metrics or "skipped" in base:
+            continue
+        for name, value in metrics.items():
+            old = base.get(name)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or old <= 0:
+                continue
+            if abs(value - old) < MIN_ABSOLUTE_CHANGE.get(name, 0.0):
+                continue
+            if name in HIGHER_IS_BETTER and value < old * (1 - tolerance):
+                regressions.append((case, name, old, value))
+            elif name in LOWER_IS_BETTER and value > old * (1 + tolerance):
+                regressions.append((case, name, old, value))
+    return regressions
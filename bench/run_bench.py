@@ -0,0 +1,82 @@
+# run_bench.py
+# Runs the offline benchmark suite for all four tools and flags regressions against a baseline.
+import argparse
+import os
+import sys
+import tempfile
+import traceback
+
+import harness
+
+harness.install_search_path()
+from cases import COMPONENTS # noqa: E402 (needs the search path above)
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "latest.json")
+
+
+def run_suite(components, quick):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench_") as workdir:
+        for component in components:
+            component_dir = os.path.join(workdir, component)
+            os.makedirs(component_dir)
+            try:
+                cases = COMPONENTS[component](quick, component_dir)
+            except ImportError as e:
+                results[component] = {"skipped": f"missing dependency: {e}"}
+                print(f"{component:<32} skipped ({e})")
+                continue
+            for name, run in cases:
+                try:
+                    results[name] = run()
+                except Exception as e:
+                    results[name] = {"error": f"{type(e).__name__}: {e}"}
+                    traceback.print_exc()
+                print(format_row(name, results[name]))
+    return results
+
+
+def format_row(name, metrics):
+    if "skipped" in metrics or "error" in metrics:
+        return f"{name:<32} {metrics.get('skipped') or 'ERROR ' + metrics['error']}"
+    if "import_s" in metrics:
+        return f"{name:<32} {'':>22} {'':>27} import {metrics['import_s'] * 1000:8.1f} ms"
+    return (f"{name:<32} {metrics['throughput']:>12,.0f} {metrics['unit']:<9} "
+            f"p50/p99 {metrics['p50_ms']:8.2f}/{metrics['p99_ms']:8.2f} ms  peak {metrics['peak_mem_mb']:7.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline, deterministic benchmarks for every tool, with regression checks.")
+    parser.add_argument("--components", nargs="+", choices=sorted(COMPONENTS), default=list(COMPONENTS))
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs and fewer iterations (smoke test).")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write this run's JSON results.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Results JSON to compare against.")
+    parser.add_argument("--save-baseline", action="store_true", help="Also store this run as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a metric counts as a regression (0.25 = 25%%).")
+    args = parser.parse_args()
+
+    current = {"environment": harness.environment_info(), "quick": args.quick, "results": run_suite(args.components, args.quick)}
+    harness.save_results(current, args.output)
+    print(f"\nResults written to {args.output}")
+
+    failed = [name for name, metrics in current["results"].items() if "error" in metrics]
+    if args.save_baseline:
+        harness.save_results(current, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        baseline = harness.load_results(args.baseline)
+        if baseline.get("quick") != args.quick:
+            print("Warning: baseline was recorded with a different --quick setting; comparisons are not meaningful.")
+        regressions = harness.compare(current, baseline, args.tolerance)
+        for case, metric, old, new in regressions:
+            print(f"REGRESSION {case} {metric}: {old:,.4g} -> {new:,.4g} ({(new - old) / old:+.0%})")
+        if not regressions:
+            print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+        failed += [case for case, *_ in regressions]
+    else:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+
+    if failed:
+        sys.exit(1)
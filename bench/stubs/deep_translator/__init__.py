@@ -0,0 +1,22 @@
+# Offline stand-in for deep_translator, used only by the benchmark suite.
+# Mirrors the small surface translation_logic.py touches; "translation" reverses each word.
+from .exceptions import NotValidPayload, TranslationNotFound
+
+_LANGUAGES = {
+    "english": "en", "french": "fr", "german": "de", "spanish": "es", "italian": "it",
+    "portuguese": "pt", "urdu": "ur", "arabic": "ar", "chinese (simplified)": "zh-CN", "japanese": "ja",
+}
+
+
+class GoogleTranslator:
+    def __init__(self, source="auto", target="en"):
+        self.source = source
+        self.target = target
+
+    def get_supported_languages(self, as_dict=False):
+        return dict(_LANGUAGES) if as_dict else list(_LANGUAGES)
+
+    def translate(self, text):
+        if len(text) > 5000:
+            raise NotValidPayload(text)
+        return " ".join(word[::-1] for word in text.split())
@@ -0,0 +1,6 @@
+class NotValidPayload(Exception):
+    pass
+
+
+class TranslationNotFound(Exception):
+    pass
@@ -0,0 +1,187 @@
+# ui_dispatcher.py
+# Shared by the Tk apps: runs heavy work on a thread pool and hands every widget update back to
+# the Tk thread, which is the only thread allowed to touch widgets.
+import collections
+import itertools
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_POLL_MS = 16 # About one frame at 60 Hz
+DEFAULT_BUDGET_MS = 8 # Most time one drain may spend running updates before yielding to Tk events
+LATENCY_WINDOW = 256 # Recent samples kept for the latency figures
+
+
+class UIDispatcher:
+    """Worker pool + main-thread update queue for one Tk root.
+
+    post() may be called from any thread; the callback runs on the Tk thread at the next drain.
+    Posting again under the same key before the first one ran replaces it (coalescing), so a
+    burst of progress or frame updates costs one widget update, not one per event.
+
+    submit() runs fn on the pool and delivers its result to on_done on the Tk thread. A submit
+    with a key supersedes earlier ones with that key: if they haven't started they are
+    cancelled, and if they have, their results are dropped.
+    """
+
+    def __init__(self, root, max_workers=1, poll_ms=DEFAULT_POLL_MS, budget_ms=DEFAULT_BUDGET_MS, name="ui-worker"):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.budget_s = budget_ms / 1000.0
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._order = collections.deque() # Keys in posting order
+        self._pending = {} # key -> (callback, args, posted_at)
+        self._unique = itertools.count() # Keys for updates that must never be coalesced
+        self._generations = {} # submit key -> latest generation (Tk thread only)
+        self._futures = {} # submit key -> latest future (Tk thread only)
+        self._running_tasks = 0
+        self._closed = False
+
+        self.posted = 0
+        self.coalesced = 0
+        self.executed = 0
+        self.max_queue_depth = 0
+        self._update_latency = collections.deque(maxlen=LATENCY_WINDOW) # post() -> callback start, seconds
+        self._loop_lag = collections.deque(maxlen=LATENCY_WINDOW) # How late the drain tick fired, seconds
+        self._next_tick = time.perf_counter() + poll_ms / 1000.0
+        self._job = root.after(poll_ms, self._drain)
+
+    def post(self, callback, *args, key=None):
+        """Schedules callback(*args) on the Tk thread. Thread-safe."""
+        now = time.perf_counter()
+        with self._lock:
+            if self._closed:
+                return
+            self.posted += 1
+            if key is not None and key in self._pending:
+                # Keep the original slot and timestamp: latency is measured from the oldest waiting update
+                self.coalesced += 1
+                self._pending[key] = (callback, args, self._pending[key][2])
+                return
+            if key is None:
+                key = ("_unique", next(self._unique))
+            self._pending[key] = (callback, args, now)
+            self._order.append(key)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._order))
+
+    def submit(self, fn, *args, on_done=None, on_error=None, key=None):
+        """Runs fn(*args) on the pool; on_done(result) / on_error(exc) then run on the Tk thread.
+
+        Call from the Tk thread. Without on_error, exceptions go to Tk's report_callback_exception.
+        """
+        generation = None
+        if key is not None:
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+            previous = self._futures.get(key)
+            if previous is not None:
+                previous.cancel() # Only succeeds if it hasn't started; otherwise its result is dropped below
+
+        def deliver(callback, value):
+            if key is not None and self._generations.get(key) != generation:
+                return # Superseded by a newer submit with the same key
+            if callback is not None:
+                callback(value)
+
+        def task():
+            with self._lock:
+                self._running_tasks += 1
+            try:
+                result = fn(*args)
+            except Exception as e:
+                if on_error is not None:
+                    self.post(deliver, on_error, e, key=None if key is None else ("_result", key))
+                else:
+                    self.post(self._report_exception, e)
+                return
+            finally:
+                with self._lock:
+                    self._running_tasks -= 1
+            self.post(deliver, on_done, result, key=None if key is None else ("_result", key))
+
+        future = self.executor.submit(task)
+        if key is not None:
+            self._futures[key] = future
+        return future
+
+    def cancel(self, key):
+        """Supersedes the latest submit with key: cancelled if not started, its result dropped if it has."""
+        self._generations[key] = self._generations.get(key, 0) + 1
+        future = self._futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def _report_exception(self, exc):
+        self.root.report_callback_exception(type(exc), exc, exc.__traceback__)
+
+    def _drain(self):
+        start = time.perf_counter()
+        self._loop_lag.append(max(0.0, start - self._next_tick))
+        deadline = start + self.budget_s
+        while True:
+            with self._lock:
+                if not self._order:
+                    break
+                key = self._order.popleft()
+                callback, args, posted_at = self._pending.pop(key)
+            now = time.perf_counter()
+            self._update_latency.append(now - posted_at)
+            self.executed += 1
+            try:
+                callback(*args)
+            except Exception:
+                self.root.report_callback_exception(*sys.exc_info())
+            if time.perf_counter() >= deadline:
+                break # Leave the rest for the next tick so input and redraws get a turn
+        if not self._closed:
+            self._next_tick = time.perf_counter() + self.poll_ms / 1000.0
+            self._job = self.root.after(self.poll_ms, self._drain)
+
+    def stats(self):
+        """Queue depth, throughput counters and Tk-thread latency (ms) over recent updates."""
+        with self._lock:
+            depth = len(self._order)
+            running = self._running_tasks
+        update_latency = sorted(self._update_latency)
+        loop_lag = sorted(self._loop_lag)
+
+        def summary(samples):
+            if not samples:
+                return {"mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+            return {"mean_ms": round(1000 * sum(samples) / len(samples), 2),
+                    "p95_ms": round(1000 * samples[int(0.95 * (len(samples) - 1))], 2),
+                    "max_ms": round(1000 * samples[-1], 2)}
+
+        return {
+            "queue_depth": depth,
+            "max_queue_depth": self.max_queue_depth,
+            "running_tasks": running,
+            "posted": self.posted,
+            "coalesced": self.coalesced,
+            "executed": self.executed,
+            "update_latency": summary(update_latency),
+            "loop_lag": summary(loop_lag),
+        }
+
+    def describe(self):
+        """One-line stats summary, e.g. for a status bar."""
+        s = self.stats()
+        return (f"UI queue {s['queue_depth']} (max {s['max_queue_depth']}), tasks {s['running_tasks']}, "
+                f"update latency p95 {s['update_latency']['p95_ms']:.1f} ms, "
+                f"loop lag p95 {s['loop_lag']['p95_ms']:.1f} ms, coalesced {s['coalesced']}/{s['posted']}")
+
+    def shutdown(self):
+        """Stops draining and drops queued work; call before destroying the root."""
+        with self._lock:
+            self._closed = True
+            self._order.clear()
+            self._pending.clear()
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except Exception:
+                pass # Root already destroyed
+            self._job = None
+        self.executor.shutdown(wait=False, cancel_futures=True)